@@ -1,15 +1,16 @@
 import sys
-from functions.app_manager import AppManager
-from functions.music_controller import MusicController
-from functions.messenger import Messenger
-from functions.marks_monitor import MarksMonitor
-from functions.safari_searcher import SafariSearcher
-from functions.screen_summarizer import capture_screen_and_summarize
-from functions.file_operations import perform_file_operation
-from functions.bluetooth_manager import BluetoothManager
+# The functions modules are imported where they are used: the screen
+# summarizer and messenger pull in PyObjC Vision and LangChain, which the
+# assistant should not pay for at startup
 
 
 def main():
+    from functions.app_manager import AppManager
+    from functions.music_controller import MusicController
+    from functions.messenger import Messenger
+    from functions.marks_monitor import MarksMonitor
+    from functions.safari_searcher import SafariSearcher
+    from functions.bluetooth_manager import BluetoothManager
     app_manager = AppManager()
     music_controller = MusicController()
     messenger = Messenger()
@@ -95,41 +96,49 @@ chatbox_process = None
 # Global functions for external use
 def open_app(app_name):
     """Open an application"""
+    from functions.app_manager import AppManager
     app_manager = AppManager()
     return app_manager.open_app(app_name)
 
 def close_app(app_name):
     """Close an application"""
+    from functions.app_manager import AppManager
     app_manager = AppManager()
     return app_manager.close_app(app_name)
 
 def play_music(song_name):
     """Play music"""
+    from functions.music_controller import MusicController
     music_controller = MusicController()
     return music_controller.play_music(song_name)
 
 def send_whatsapp_message(contact_name, message):
     """Send WhatsApp message"""
+    from functions.messenger import Messenger
     messenger = Messenger()
     return messenger.send_whatsapp_message(contact_name, message)
 
 def monitor_music_playback():
     """Monitor music playback"""
+    from functions.music_controller import MusicController
     music_controller = MusicController()
     return music_controller.monitor_music_playback()
 
 def start_monitor_marks():
     """Start marks monitoring"""
+    from functions.marks_monitor import MarksMonitor
     marks_monitor = MarksMonitor()
     return marks_monitor.start_monitor_marks()
 
 def stop_monitor_marks():
     """Stop marks monitoring"""
+    from functions.marks_monitor import MarksMonitor
     marks_monitor = MarksMonitor()
     return marks_monitor.stop_monitor_marks()
 
 def start_bluetooth():
     """Start Bluetooth"""
+    from functions.bluetooth_manager import BluetoothManager
     bluetooth_manager = BluetoothManager()
     return bluetooth_manager.connect_jbl()
 
@@ -172,6 +181,7 @@ def close_chatbox():
 
 def search_safari(query):
     """Search in Safari"""
+    from functions.safari_searcher import SafariSearcher
     safari_searcher = SafariSearcher()
     return safari_searcher.search_in_safari(query)
 
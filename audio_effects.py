@@ -0,0 +1,100 @@
+"""
+Audio effects module for the Optimus Prime Voice Assistant
+"""
+import numpy as np
+from audio_sources import resample
+
+
+def time_stretch(samples, speed, rate, window_seconds=0.032):
+    """
+    Play a clip `speed` times faster without changing its pitch.
+    Phase vocoder: STFT frames are re-sampled in time and their phases
+    re-accumulated, all frames at once.
+    """
+    samples = np.asarray(samples, dtype=np.int16)
+    if speed == 1.0 or not samples.size:
+        return samples
+    n_fft = 1 << int(np.ceil(np.log2(rate * window_seconds)))
+    if samples.size < n_fft:
+        return samples  # Shorter than one analysis frame - too short to stretch
+    hop = n_fft // 4
+    window = np.hanning(n_fft + 1)[:-1]
+
+    # Centre the first and last frames on the clip's edges
+    pad = n_fft // 2
+    signal = np.pad(samples.astype(np.float64), (pad, pad))
+    frames = np.lib.stride_tricks.sliding_window_view(signal, n_fft)[::hop] * window
+    spectrum = np.fft.rfft(frames, axis=1)
+
+    positions = np.arange(0, spectrum.shape[0] - 1, speed)
+    index = positions.astype(np.int64)
+    fraction = (positions - index)[:, None]
+    magnitude = (1 - fraction) * np.abs(spectrum[index]) + fraction * np.abs(spectrum[index + 1])
+
+    # Phase advance per hop: the bin's centre frequency plus its measured deviation
+    analysis_phase = np.angle(spectrum[index])
+    expected = 2 * np.pi * hop * np.arange(spectrum.shape[1]) / n_fft
+    deviation = np.angle(spectrum[index + 1]) - analysis_phase - expected
+    deviation -= 2 * np.pi * np.round(deviation / (2 * np.pi))
+    advance = np.vstack([np.zeros_like(expected), (expected + deviation)[:-1]])
+    phase = np.angle(spectrum[0]) + np.cumsum(advance, axis=0)
+
+    # Identity phase locking: bins around a spectral peak keep their analysis
+    # phase relative to the peak, which avoids the "phasey" sound on speech
+    peak_bins = _nearest_peaks(magnitude)
+    rows = np.arange(len(phase))[:, None]
+    phase = phase[rows, peak_bins] + analysis_phase - analysis_phase[rows, peak_bins]
+
+    frames = np.fft.irfft(magnitude * np.exp(1j * phase), n=n_fft, axis=1) * window
+    offsets = (np.arange(len(frames)) * hop)[:, None] + np.arange(n_fft)
+    output = np.bincount(offsets.ravel(), weights=frames.ravel())
+    norm = np.bincount(offsets.ravel(), weights=np.tile(window ** 2, len(frames)))
+    output = np.where(norm > 1e-6, output / np.maximum(norm, 1e-6), 0.0)
+
+    start = pad
+    length = int(round(samples.size / speed))
+    return np.clip(output[start:start + length], -32768, 32767).astype(np.int16)
+
+
+def _nearest_peaks(magnitude):
+    """For every bin of every frame, the index of the closest local magnitude peak"""
+    bins = np.arange(magnitude.shape[1])
+    padded = np.pad(magnitude, ((0, 0), (1, 1)))
+    peaks = (magnitude > padded[:, :-2]) & (magnitude >= padded[:, 2:])
+    peaks[:, 0] |= ~peaks.any(axis=1)  # Silent frames lock to bin 0
+    previous = np.maximum.accumulate(np.where(peaks, bins, -1), axis=1)
+    following = np.minimum.accumulate(np.where(peaks, bins, bins.size)[:, ::-1], axis=1)[:, ::-1]
+    previous_distance = np.where(previous >= 0, bins - previous, bins.size)
+    following_distance = np.where(following < bins.size, following - bins, bins.size)
+    return np.where(previous_distance <= following_distance, previous, following)
+
+
+def apply_gain(samples, volume):
+    """Scale a clip by `volume` (1.0 = unchanged), clipping at full scale"""
+    samples = np.asarray(samples, dtype=np.int16)
+    if volume is None or volume == 1.0:
+        return samples
+    return np.clip(samples.astype(np.float32) * volume, -32768, 32767).astype(np.int16)
+
+
+def apply_effects(samples, rate, speed=1.0, volume=None, output_rate=None):
+    """
+    Time-stretch, gain and resample a 16-bit clip.
+    Returns (samples, sample_rate); output_rate=None keeps the clip's rate.
+    """
+    samples = apply_gain(time_stretch(samples, speed, rate), volume)
+    if output_rate and output_rate != rate:
+        samples = np.clip(resample(samples.astype(np.float32), rate, output_rate),
+                          -32768, 32767).astype(np.int16)
+        rate = output_rate
+    return samples, rate
+
+
+def variant_tag(speed=1.0, volume=None):
+    """Speech cache key suffix for a speed/volume variant ("" for the base clip)"""
+    tag = ""
+    if speed != 1.0:
+        tag += f"@x{speed:.2f}"
+    if volume is not None and volume != 1.0:
+        tag += f"@v{volume:.2f}"
+    return tag
@@ -1,128 +1,121 @@
 """
 Audio handling module for the Optimus Prime Voice Assistant
 """
-import subprocess
 import threading
+import time
+import numpy as np
+from audio_effects import apply_effects
+from audio_output import get_audio_sink
+from audio_sources import read_wav, resample
+from playback_engine import PlaybackEngine
 
 
 class AudioHandler:
-    def __init__(self):
+    def __init__(self, reference_rate=16000, sink=None, output_rate=None, on_playback_idle=None):
         self.is_audio_playing = threading.Event()
         self.is_music_playing = threading.Event()
+        self.playback_cancelled = threading.Event()
+        # (samples, start_time, speed) of the clip being played, resampled to the
+        # capture rate so barge-in detection can tell the assistant's echo apart
+        self.playback_reference = None
+        self.reference_rate = reference_rate
+        # Clips are resampled to this rate when set, so the output stream never
+        # has to be reopened between voices with different sample rates
+        self.output_rate = output_rate
+        # Output sink and the playback thread in front of it, started on first use
+        self._sink = sink
+        # Called whenever everything queued has been heard
+        self.on_playback_idle = on_playback_idle
+        self._engine = None
+        self._engine_lock = threading.Lock()
 
-    def wait_for_file_write_complete(self, file_path, timeout=15):
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = PlaybackEngine(self._sink or get_audio_sink(), on_idle=self.on_playback_idle)
+        return self._engine
+
+    @property
+    def sink(self):
+        return self.engine.sink
+
+    def close(self):
+        """Stop the playback thread and release the output device"""
+        if self._engine is not None:
+            self._engine.close()
+
+    def stop_playback(self):
+        """Interrupt the clip that is currently playing and drop queued clips"""
+        self.playback_cancelled.set()
+        if self._engine is not None:
+            self._engine.cancel()
+
+    def queue_samples(self, samples, rate, speed=1.0, volume=None, on_start=None, on_done=None):
         """
-        Wait for a file to be completely written by checking its size over time.
-        This is crucial for preventing issues where audio is cut off because playback starts before writing is complete.
-        Extended timeout and more thorough checks to ensure complete file writing.
+        Queue 16-bit mono PCM for playback without waiting and return its
+        PlaybackItem. Clips queued back to back play without a gap.
+        on_start fires when the first samples are queued and on_done(completed)
+        when the clip has finished or was cut off. Callers queueing several
+        clips keep is_audio_playing set themselves.
+        Speed is a time-stretch that keeps the pitch; synthesized speech gets
+        it applied (and cached) at synthesis, see submit_speech.
         """
-        import time
-        import os
-        start_time = time.time()
-        
-        # Wait until the file exists
-        while not os.path.exists(file_path):
-            if time.time() - start_time > timeout:
-                return False
-            time.sleep(0.05)
-        
-        # Monitor the file size to ensure writing is complete
-        # Use multiple checks to ensure file is really done being written
-        size_checks = []
-        stable_count = 0
-        required_stable_checks = 5  # Require 5 consistent readings
-        
-        while True:
-            try:
-                current_size = os.path.getsize(file_path)
-                size_checks.append(current_size)
-                
-                # Keep last several size checks
-                if len(size_checks) > required_stable_checks:
-                    size_checks = size_checks[-required_stable_checks:]
-                
-                # Check if all recent size readings are the same
-                if len(size_checks) >= required_stable_checks and len(set(size_checks)) == 1:
-                    stable_count += 1
-                    if stable_count >= 2:  # Require stability for 2 consecutive checks
-                        # Additional delay to ensure file handle is completely released
-                        time.sleep(0.2)
-                        return True
-                else:
-                    stable_count = 0  # Reset if size changes
-                
-                time.sleep(0.1)
-                
-                if time.time() - start_time > timeout:
-                    # Timeout reached but file exists, return True to try to play it
-                    time.sleep(0.1)  # Small additional delay
-                    return True
-            except OSError:
-                time.sleep(0.05)
-                continue
+        self.playback_cancelled.clear()
+        samples, rate = apply_effects(samples, rate, speed, volume, self.output_rate)
+        reference = resample(samples.astype(np.float32), rate, self.reference_rate).astype(np.int16)
+
+        def started():
+            self.playback_reference = (reference, time.perf_counter(), 1.0)
+            if on_start:
+                on_start()
 
-    def play_audio_file(self, audio_path, speed=1.0, quality=1, volume=None):
+        def finished(completed):
+            # Dropped clips finish while another one may still be playing
+            current = self.playback_reference
+            if current is not None and current[0] is reference:
+                self.playback_reference = None
+            if on_done:
+                on_done(completed)
+
+        return self.engine.enqueue(samples, rate, on_start=started, on_done=finished)
+
+    def play_samples(self, samples, rate, speed=1.0, volume=None, on_start=None, on_done=None):
         """
-        Centralized function to play audio files using afplay with enhanced settings to prevent word skipping
+        Play 16-bit mono PCM straight from memory and block until playback
+        ends. See queue_samples for the callbacks.
         """
-        import time
-        
-        # Check if the audio file exists and is completely written
-        if not self.wait_for_file_write_complete(audio_path):
+        was_playing = self.is_audio_playing.is_set()
+        self.is_audio_playing.set()
+        try:
+            completed = self.queue_samples(samples, rate, speed, volume, on_start, on_done).wait()
+        finally:
+            if not was_playing:
+                self.is_audio_playing.clear()
+
+        if self.playback_cancelled.is_set():
+            print("⏹️ Playback interrupted")
+            return False
+        return completed
+
+    def play_audio_file(self, audio_path, speed=1.0, volume=None, ready=None, timeout=15):
+        """
+        Play a WAV file through the playback engine, like a synthesized clip.
+        A file that is still being produced needs the producer's `ready`
+        event (set once write_wav_atomic has renamed it into place); without
+        one the file must already be complete. An existing path alone proves
+        nothing - it may be left over from an earlier run.
+        Playback can be interrupted from another thread with stop_playback().
+        """
+        if ready is not None and not ready.wait(timeout):
             print(f"❌ Audio file not ready for playback: {audio_path}")
             return False
-        
-        # Additional safety: try to open and briefly read the file to ensure it's accessible
+
         try:
-            with open(audio_path, 'rb') as f:
-                # Read first 100 bytes to ensure file is readable and not locked
-                f.read(100)
-            # Small delay to allow any file handles to be properly released
-            time.sleep(0.2)
+            samples, rate = read_wav(audio_path)
         except Exception as e:
-            print(f"❌ Cannot access audio file: {e}")
-            return False
-        
-        try:
-            # Build afplay command with enhanced quality settings
-            cmd = ["afplay"]
-            
-            # Add quality setting - higher value for better quality (1 is high quality)
-            cmd.extend(["-q", str(quality)])
-            
-            # Add speed setting if different from normal (1.0 is normal)
-            if speed != 1.0:
-                cmd.extend(["-r", str(speed)])
-            
-            # Add volume setting if specified (0.0 to 1.0, where 1.0 is maximum)
-            if volume is not None:
-                cmd.extend(["-v", str(volume)])
-            
-            # Add the audio file path
-            cmd.append(audio_path)
-            
-            # Use the afplay command with optimized settings
-            # Using a generous timeout to ensure complete playback
-            result = subprocess.run(cmd, check=True, timeout=90, capture_output=True)
-            
-            # Ensure the subprocess completes properly
-            if result.returncode == 0:
-                # Additional delay after playback to ensure complete processing
-                time.sleep(0.3)
-                return True
-            else:
-                print(f"❌ afplay returned non-zero: {result.returncode}")
-                if result.stderr:
-                    print(f"   stderr: {result.stderr.decode()}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print("⏰ Audio playback timeout")
+            print(f"❌ Cannot read audio file: {e}")
             return False
-        except Exception as e:
-            print(f"❌ Audio playback failed: {e}")
-            if 'result' in locals() and hasattr(result, 'stderr') and result.stderr:
-                stderr_output = result.stderr.decode().strip()
-                if stderr_output:
-                    print(f"   afplay stderr: {stderr_output}")
-            return False
\ No newline at end of file
+        samples = np.clip(samples, -32768, 32767).astype(np.int16)
+        return self.play_samples(samples, rate, speed=speed, volume=volume)
@@ -0,0 +1,258 @@
+"""
+Audio output module for the Optimus Prime Voice Assistant
+"""
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+import numpy as np
+
+AUDIO_SINK = os.environ.get("OPTIMUS_AUDIO_SINK", "pyaudio")
+
+
+class AudioSink:
+    """
+    Base class for playback sinks.
+    A sink plays 16-bit mono PCM from memory. play() blocks until the clip
+    has been heard (or stop() was called) and calls on_start the moment
+    the first samples reach the device. write() returns once the clip is
+    queued on the device, so the next write follows it without a gap;
+    drain() waits for written audio to play out.
+    """
+    name = "sink"
+
+    def play(self, samples, rate, on_start=None):
+        raise NotImplementedError
+
+    def write(self, samples, rate, on_start=None):
+        return self.play(samples, rate, on_start)
+
+    def drain(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PyAudioSink(AudioSink):
+    """Persistent PyAudio output stream - no process spawn or file per reply"""
+    name = "pyaudio"
+
+    def __init__(self, block=1024):
+        import pyaudio
+        self._pyaudio_module = pyaudio
+        self._pyaudio = pyaudio.PyAudio()
+        self.block = block
+        self._stream = None
+        self._stream_rate = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _open(self, rate):
+        if self._stream is not None and self._stream_rate == rate:
+            if self._stream.is_stopped():
+                self._stream.start_stream()
+            return self._stream
+        self._drain_stream()
+        self._close_stream()
+        self._stream = self._pyaudio.open(
+            format=self._pyaudio_module.paInt16,
+            channels=1,
+            rate=rate,
+            output=True,
+            frames_per_buffer=self.block
+        )
+        self._stream_rate = rate
+        return self._stream
+
+    def play(self, samples, rate, on_start=None):
+        completed = self.write(samples, rate, on_start)
+        self.drain()
+        return completed and not self._stop.is_set()
+
+    def write(self, samples, rate, on_start=None):
+        with self._lock:
+            self._stop.clear()
+            stream = self._open(rate)
+            data = np.ascontiguousarray(samples, dtype=np.int16)
+            if on_start:
+                on_start()
+            for start in range(0, data.size, self.block):
+                if self._stop.is_set():
+                    break
+                stream.write(data[start:start + self.block].tobytes())
+            return not self._stop.is_set()
+
+    def drain(self):
+        with self._lock:
+            self._drain_stream()
+
+    def stop(self):
+        self._stop.set()
+
+    def _drain_stream(self):
+        # stop_stream() returns once the queued buffers have been played
+        if self._stream is not None and not self._stream.is_stopped():
+            self._stream.stop_stream()
+
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            finally:
+                self._stream = None
+                self._stream_rate = None
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._close_stream()
+            self._pyaudio.terminate()
+
+
+class AfplaySink(AudioSink):
+    """Fallback for hosts without PyAudio: plays a fully written temp WAV with afplay"""
+    name = "afplay"
+
+    def __init__(self, quality=1):
+        self.quality = quality
+        self._process = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def play(self, samples, rate, on_start=None):
+        with self._lock:
+            self._stop.clear()
+            fd, path = tempfile.mkstemp(prefix="optimus_", suffix=".wav")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    write_wav(f, samples, rate)
+                if self._stop.is_set():
+                    return False
+                self._process = subprocess.Popen(
+                    ["afplay", "-q", str(self.quality), path],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+                )
+                if on_start:
+                    on_start()
+                duration = len(samples) / float(rate)
+                try:
+                    _, stderr = self._process.communicate(timeout=duration + 10)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+                    self._process.communicate()
+                    print("⏰ Audio playback timeout")
+                    return False
+                if self._process.returncode != 0 and not self._stop.is_set():
+                    print(f"❌ afplay returned non-zero: {self._process.returncode}")
+                    if stderr:
+                        print(f"   stderr: {stderr.decode()}")
+                    return False
+                return not self._stop.is_set()
+            finally:
+                self._process = None
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stop(self):
+        self._stop.set()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+
+class NullSink(AudioSink):
+    """
+    Plays nothing. Records what would have been played, for tests and
+    benchmarks; optionally paces clips in real time and saves them as WAVs.
+    """
+    name = "null"
+
+    def __init__(self, realtime=False, record_dir=None):
+        self.realtime = realtime
+        self.record_dir = record_dir
+        self.plays = []
+        self._stop = threading.Event()
+
+    def play(self, samples, rate, on_start=None):
+        self._stop.clear()
+        started = time.perf_counter()
+        if on_start:
+            on_start()
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            write_wav(os.path.join(self.record_dir, f"play_{len(self.plays):04d}.wav"), samples, rate)
+        duration = len(samples) / float(rate)
+        completed = not self._stop.wait(duration) if self.realtime else True
+        self.plays.append({
+            "start": started,
+            "end": time.perf_counter(),
+            "duration": duration,
+            "rate": rate,
+            "completed": completed,
+        })
+        return completed
+
+    def stop(self):
+        self._stop.set()
+
+
+AUDIO_SINKS = {
+    PyAudioSink.name: PyAudioSink,
+    AfplaySink.name: AfplaySink,
+    NullSink.name: NullSink,
+}
+
+
+def write_wav(file, samples, rate):
+    """Write 16-bit mono PCM samples to a WAV file path or file object"""
+    with wave.open(file, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+
+
+def write_wav_atomic(path, samples, rate):
+    """
+    Write a WAV file so readers only ever see the complete clip: the data
+    goes to a temp file in the same directory, which is then renamed over
+    `path`. Returns the file size in bytes.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".wav.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_wav(f, samples, rate)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+        return size
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def get_audio_sink(name=None):
+    """Create the configured playback sink, falling back to afplay"""
+    name = name or AUDIO_SINK
+    sink_class = AUDIO_SINKS.get(name)
+    if sink_class is None:
+        print(f"⚠️ Unknown audio sink '{name}', using afplay")
+        return AfplaySink()
+    try:
+        return sink_class()
+    except Exception as e:
+        if sink_class is AfplaySink:
+            raise
+        print(f"⚠️ Audio sink '{name}' unavailable ({e}), using afplay")
+        return AfplaySink()
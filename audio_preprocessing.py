@@ -0,0 +1,116 @@
+"""
+Audio preprocessing module for the Optimus Prime Voice Assistant
+"""
+import numpy as np
+
+
+def frame_rms(samples, frame_size=256):
+    """RMS of each frame of a float sample array, computed in one vectorized pass"""
+    if samples.size == 0:
+        return np.zeros(1, dtype=np.float32)
+    usable = samples.size - samples.size % frame_size
+    if usable == 0:
+        return np.sqrt(np.mean(samples * samples, keepdims=True))
+    frames = samples[:usable].reshape(-1, frame_size)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+class NoiseFloorTracker:
+    """
+    Tracks the background noise level from frame energies.
+    The floor follows quiet frames down quickly and rises slowly, so speech
+    doesn't drag it up; anything well above the floor counts as speech.
+    """
+
+    def __init__(self, initial_floor=300.0, min_threshold=300.0, snr_ratio=3.0, attack=0.5, release=0.02):
+        self.floor = float(initial_floor)
+        self.min_threshold = min_threshold  # Never call anything quieter than this speech
+        self.snr_ratio = snr_ratio          # How far above the floor speech has to be
+        self.attack = attack                # Smoothing when the floor falls
+        self.release = release              # Smoothing when the floor rises
+
+    @property
+    def threshold(self):
+        """Current speech energy threshold"""
+        return max(self.min_threshold, self.floor * self.snr_ratio)
+
+    def is_speech(self, rms):
+        return rms >= self.threshold
+
+    def update(self, levels):
+        """Update the floor from the frame RMS values of one chunk"""
+        quietest = float(np.min(levels))
+        rate = self.attack if quietest < self.floor else self.release
+        self.floor += rate * (quietest - self.floor)
+
+
+class HighPassFilter:
+    """
+    Removes DC offset and low-frequency rumble by subtracting a moving average.
+    Vectorized with a cumulative sum; the tail of each chunk is carried over so
+    the filter runs seamlessly across chunk boundaries.
+    """
+
+    def __init__(self, rate, cutoff=100.0):
+        self.window = max(2, int(rate / cutoff))
+        self._history = np.zeros(self.window - 1, dtype=np.float64)
+
+    def process(self, samples):
+        padded = np.concatenate((self._history, samples))
+        cumsum = np.concatenate(([0.0], np.cumsum(padded, dtype=np.float64)))
+        moving_average = (cumsum[self.window:] - cumsum[:-self.window]) / self.window
+        self._history = padded[-(self.window - 1):]
+        return (samples - moving_average).astype(np.float32)
+
+
+class AutomaticGainControl:
+    """
+    Brings speech to a steady level for the recognizer.
+    The gain only adapts on speech, so background noise isn't pumped up in
+    pauses, and changes are ramped across the chunk to avoid clicks.
+    While `frozen` is set the gain is held where it is.
+    """
+
+    def __init__(self, target_rms=3000.0, min_gain=0.5, max_gain=8.0, adapt_rate=0.2):
+        self.target_rms = target_rms
+        self.min_gain = min_gain
+        self.max_gain = max_gain
+        self.adapt_rate = adapt_rate
+        self.gain = 1.0
+        self.frozen = False
+
+    def process(self, samples, rms, voiced):
+        start_gain = self.gain
+        if voiced and rms > 0 and not self.frozen:
+            desired = min(self.max_gain, max(self.min_gain, self.target_rms / rms))
+            self.gain += self.adapt_rate * (desired - self.gain)
+        if self.gain == start_gain:
+            return samples * self.gain
+        return samples * np.linspace(start_gain, self.gain, samples.size, dtype=np.float32)
+
+
+class AudioPreprocessor:
+    """
+    High-pass filter, noise floor tracking and automatic gain control applied
+    to every captured chunk before it reaches the endpointer and recognizer
+    """
+
+    def __init__(self, rate, highpass_cutoff=100.0, target_rms=3000.0, max_gain=8.0):
+        self.highpass = HighPassFilter(rate, highpass_cutoff)
+        self.noise_floor = NoiseFloorTracker()
+        self.agc = AutomaticGainControl(target_rms=target_rms, max_gain=max_gain)
+
+    def hold_gain(self, hold):
+        """Stop (or resume) gain adaptation, e.g. while the assistant's own voice is playing"""
+        self.agc.frozen = hold
+
+    def process(self, data):
+        """Clean one chunk of 16-bit PCM; returns a byte view of the processed samples"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        filtered = self.highpass.process(samples)
+        levels = frame_rms(filtered)
+        rms = float(np.sqrt(np.mean(levels * levels)))
+        voiced = self.noise_floor.is_speech(rms)
+        self.noise_floor.update(levels)
+        processed = self.agc.process(filtered, rms, voiced)
+        return memoryview(np.clip(processed, -32768, 32767).astype(np.int16)).cast("B")
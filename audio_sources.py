@@ -0,0 +1,210 @@
+"""
+Audio source module for the Optimus Prime Voice Assistant
+"""
+import os
+import threading
+import time
+import wave
+import numpy as np
+from voice_activity import chunk_rms
+
+
+class AudioSource:
+    """
+    Base class for capture sources.
+    A source delivers fixed-size chunks of 16-bit mono PCM to a callback
+    from its own thread until it is stopped.
+    """
+    name = "source"
+
+    def __init__(self, rate, chunk):
+        self.rate = rate
+        self.chunk = chunk
+
+    def start(self, on_chunk):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+    def is_active(self):
+        return False
+
+
+class PyAudioSource(AudioSource):
+    """Live microphone input through PyAudio callback mode"""
+    name = "microphone"
+
+    def __init__(self, rate, chunk, channels, sample_format):
+        super().__init__(rate, chunk)
+        self.channels = channels
+        self.sample_format = sample_format
+        self._pyaudio = None
+        self._stream = None
+
+    def start(self, on_chunk):
+        import pyaudio
+
+        def callback(in_data, frame_count, time_info, status):
+            # Runs on the PortAudio capture thread
+            on_chunk(in_data)
+            return (None, pyaudio.paContinue)
+
+        if self._pyaudio is None:
+            self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(
+            format=self.sample_format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk,
+            stream_callback=callback
+        )
+        self._stream.start_stream()
+
+    def stop(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            finally:
+                self._stream = None
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+    def is_active(self):
+        return self._stream is not None and self._stream.is_active()
+
+
+def read_wav(path):
+    """Read a WAV file as (float mono samples, sample rate) on the 16-bit scale"""
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        file_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 65536.0
+    else:
+        raise ValueError(f"Unsupported sample width {width} in '{path}'")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, file_rate
+
+
+def load_wav(path, rate):
+    """Read a WAV file as 16-bit mono PCM bytes at `rate`, converting if needed"""
+    samples, file_rate = read_wav(path)
+    samples = resample(samples, file_rate, rate)
+    return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+
+def resample(samples, from_rate, to_rate):
+    """Linear-interpolation resample of a float sample array"""
+    if from_rate == to_rate or not samples.size:
+        return samples
+    duration = samples.size / float(from_rate)
+    target = np.arange(int(duration * to_rate)) / float(to_rate)
+    return np.interp(target, np.arange(samples.size) / float(from_rate), samples)
+
+
+class ReplaySource(AudioSource):
+    """
+    Replays WAV files as if they were spoken into the microphone.
+    Chunks are paced at `speed` times real time. Silence is emitted before
+    the first file, between files and after the last one, like a quiet room.
+    """
+    name = "replay"
+
+    def __init__(self, paths, rate, chunk, speed=1.0, lead_in=0.5, gap=1.5, speech_threshold=500):
+        super().__init__(rate, chunk)
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.paths = list(paths)
+        self.speed = speed
+        self.lead_in = lead_in
+        self.gap = gap
+        self.speech_threshold = speech_threshold
+        self.on_file_start = None   # Optional callback(path) when a file begins
+        self.speech_end_times = {}  # path -> perf_counter time of its last voiced chunk
+        self.finished = threading.Event()  # Set once every file has been emitted
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, on_chunk):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_chunk,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def is_active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, on_chunk):
+        chunk_bytes = self.chunk * 2
+        silence = bytes(chunk_bytes)
+        interval = self.chunk / float(self.rate) / self.speed
+        next_time = time.perf_counter()
+
+        def emit(data):
+            nonlocal next_time
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_time += interval
+            on_chunk(data)
+
+        def emit_silence(seconds):
+            for _ in range(int(self.rate / self.chunk * seconds)):
+                if self._stop.is_set():
+                    return
+                emit(silence)
+
+        emit_silence(self.lead_in)
+        for path in self.paths:
+            audio = load_wav(path, self.rate)
+            if self.on_file_start:
+                self.on_file_start(path)
+            for offset in range(0, len(audio), chunk_bytes):
+                if self._stop.is_set():
+                    return
+                data = audio[offset:offset + chunk_bytes].ljust(chunk_bytes, b"\0")
+                emit(data)
+                if chunk_rms(data) >= self.speech_threshold:
+                    self.speech_end_times[path] = time.perf_counter()
+            emit_silence(self.gap)
+        self.finished.set()
+
+        while not self._stop.is_set():
+            emit(silence)
+
+
+class WavFileSource(ReplaySource):
+    """Replays a single WAV file"""
+
+    def __init__(self, path, rate, chunk, **kwargs):
+        super().__init__([path], rate, chunk, **kwargs)
+
+
+class DirectorySource(ReplaySource):
+    """Replays every WAV file in a directory in name order"""
+
+    def __init__(self, directory, rate, chunk, **kwargs):
+        paths = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith(".wav")
+        )
+        super().__init__(paths, rate, chunk, **kwargs)
@@ -0,0 +1,178 @@
+"""
+Barge-in module for the Optimus Prime Voice Assistant
+"""
+import threading
+import time
+import numpy as np
+from audio_preprocessing import frame_rms
+from voice_activity import chunk_rms
+
+
+class EchoSuppressor:
+    """
+    Predicts how loud the assistant's own voice is at the microphone from the
+    known playback signal, so only speech clearly above that echo counts as
+    the user talking. The speaker-to-microphone coupling starts from a small
+    prior and is learned from the first audible part of each clip, before
+    the user can react; nothing counts as user speech while it is learned.
+    """
+
+    def __init__(self, rate, chunk, margin=2.0, min_energy=400, coupling=0.25, adapt_rate=0.3, tolerance=0.15,
+                 learn_time=0.4):
+        self.rate = rate
+        self.chunk = chunk
+        self.margin = margin          # How far above the predicted echo user speech must be
+        self.min_energy = min_energy  # Ignore anything quieter than this
+        self.coupling = coupling      # Estimated echo level relative to the playback level
+        self.adapt_rate = adapt_rate
+        self.learn_time = learn_time  # Seconds from the clip's first audible frame spent learning the coupling
+        self.tolerance_chunks = max(1, int(rate / chunk * tolerance))  # Slack for output/input latency
+        self._levels = None
+        self._start_time = None
+        self._learn_start = None
+        self._speed = 1.0
+
+    def set_reference(self, samples, start_time, speed=1.0):
+        """Register the 16-bit PCM signal being played and when playback started"""
+        self._levels = frame_rms(np.asarray(samples, dtype=np.float32), self.chunk)
+        self._start_time = start_time
+        self._learn_start = None
+        self._speed = speed
+
+    def clear_reference(self):
+        self._levels = None
+
+    def expected_echo(self, now):
+        """Playback level around `now`, scaled by the learned coupling"""
+        if self._levels is None:
+            return 0.0
+        position = int((now - self._start_time) * self._speed * self.rate / self.chunk)
+        low = max(0, position - self.tolerance_chunks)
+        high = min(self._levels.size, position + self.tolerance_chunks + 1)
+        if low >= high:
+            return 0.0
+        return float(self._levels[low:high].max())
+
+    def is_user_speech(self, rms, now):
+        """Check whether a microphone chunk holds speech beyond the assistant's echo"""
+        reference = self.expected_echo(now)
+        if reference > self.min_energy and self._learn_start is None:
+            self._learn_start = now
+        if self._learn_start is not None and now - self._learn_start < self.learn_time:
+            # The clip has only just become audible, so the microphone mostly hears its echo
+            if reference > self.min_energy:
+                self.coupling += self.adapt_rate * (rms / reference - self.coupling)
+            return False
+        echo = reference * self.coupling
+        if rms < self.min_energy:
+            return False
+        if echo < self.min_energy:
+            # Little or no echo reaches the microphone (headphones, low volume)
+            return True
+        return rms > echo * self.margin
+
+
+class BargeInMonitor:
+    """
+    Watches the microphone while the assistant is speaking and interrupts it
+    when the user starts talking over it. Playback and any pending speech are
+    cancelled; the next listen starts from where the user began speaking.
+    """
+
+    def __init__(self, audio_handler, tts_handler, speech_start=0.25, pre_roll=0.3):
+        self.audio_handler = audio_handler
+        self.tts_handler = tts_handler
+        self.speech_start = speech_start
+        self.pre_roll = pre_roll
+        self._start_seq = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def take_start_seq(self):
+        """Capture position of the last barge-in, consumed by the next listen"""
+        seq, self._start_seq = self._start_seq, None
+        return seq
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.audio_handler.is_audio_playing.wait(timeout=0.5):
+                try:
+                    self._watch_playback()
+                except Exception as e:
+                    print(f"⚠️ Barge-in monitor error: {e}")
+                    time.sleep(0.5)
+                # Let the interrupted playback wind down before watching again
+                while self.audio_handler.is_audio_playing.is_set() and not self._stop.is_set():
+                    time.sleep(0.05)
+
+    def _watch_playback(self):
+        """Look for user speech until the current playback ends"""
+        from speech_to_text import get_microphone_stream, microphone_state, RATE, CHUNK
+
+        mic = get_microphone_stream()
+        # The echo level is learned against a fixed input gain; AGC adapting to
+        # the assistant's own voice would throw the learned coupling off
+        if mic.preprocessor is not None:
+            mic.preprocessor.hold_gain(True)
+        try:
+            self._watch_microphone(mic, RATE, CHUNK, microphone_state)
+        finally:
+            if mic.preprocessor is not None:
+                mic.preprocessor.hold_gain(False)
+
+    def _watch_microphone(self, mic, rate, chunk_size, microphone_state):
+        suppressor = EchoSuppressor(rate, chunk_size)
+        chunk = memoryview(bytearray(mic.chunk_bytes))
+        chunk_duration = chunk_size / float(rate)
+        pre_roll_chunks = int(rate / chunk_size * self.pre_roll)
+        reference = None
+        seq = mic.cursor()
+        voiced_run = 0.0
+        first_seq = None
+
+        while self.audio_handler.is_audio_playing.is_set() and not self._stop.is_set():
+            # Music mode turns the microphone off - no barge-in then
+            if not microphone_state.is_active():
+                time.sleep(0.1)
+                seq = mic.cursor()
+                continue
+
+            # Follow the clip currently being played
+            current = self.audio_handler.playback_reference
+            if current is not reference:
+                reference = current
+                if reference is None:
+                    suppressor.clear_reference()
+                else:
+                    suppressor.set_reference(*reference)
+
+            next_seq, nbytes = mic.readinto(seq, chunk, timeout=0.2)
+            if nbytes == 0:
+                continue
+            if suppressor.is_user_speech(chunk_rms(chunk[:nbytes]), time.perf_counter()):
+                if first_seq is None:
+                    first_seq = seq
+                voiced_run += chunk_duration
+                if voiced_run >= self.speech_start:
+                    self._trigger(max(0, first_seq - pre_roll_chunks))
+                    return
+            else:
+                voiced_run = 0.0
+                first_seq = None
+            seq = next_seq
+
+    def _trigger(self, start_seq):
+        print("✋ Barge-in detected - stopping speech")
+        self._start_seq = start_seq
+        self.tts_handler.cancel()
@@ -0,0 +1,16 @@
+"""
+Shared statistics helpers for the benchmarks
+"""
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def format_value(value, unit=""):
+    return "n/a" if value is None else f"{value:.3f}{unit}"
@@ -0,0 +1,168 @@
+"""
+Speech-to-text latency benchmark for the Optimus Prime Voice Assistant
+
+Replays a corpus of WAV files through listen_for_command, without a
+microphone, and reports end-of-speech to transcript latency, CPU time and
+word error rate. Each WAV file may have a sibling .txt file holding its
+reference transcript; files without one are left out of the WER.
+
+Usage:
+    python -m benchmarks.stt_latency corpus/ --backend vosk --speed 2
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_to_text
+from audio_sources import WavFileSource, load_wav
+from benchmarks.stats import percentile, format_value
+
+
+def normalize_words(text):
+    """Lowercase and strip punctuation so transcripts compare word by word"""
+    return re.sub(r"[^a-z0-9' ]+", " ", (text or "").lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between two transcripts"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_corpus(corpus):
+    """List (wav_path, reference_text or None) pairs from a file or directory"""
+    if os.path.isfile(corpus):
+        paths = [corpus]
+    else:
+        paths = sorted(
+            os.path.join(corpus, name)
+            for name in os.listdir(corpus)
+            if name.lower().endswith(".wav")
+        )
+    items = []
+    for path in paths:
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, "r") as f:
+                reference = f.read().strip()
+        items.append((path, reference))
+    return items
+
+
+def run_benchmark(corpus, speed=1.0):
+    """Replay every corpus file through listen_for_command and collect per-file results"""
+    results = []
+    for path, reference in load_corpus(corpus):
+        source = WavFileSource(path, speech_to_text.RATE, speech_to_text.CHUNK, speed=speed)
+        speech_to_text.set_audio_source(source)
+
+        cpu_start = time.process_time()
+        transcript = speech_to_text.listen_for_command()
+        finished = time.perf_counter()
+        cpu_time = time.process_time() - cpu_start
+        source.stop()
+
+        speech_end = source.speech_end_times.get(path)
+        audio_seconds = len(load_wav(path, speech_to_text.RATE)) / 2.0 / speech_to_text.RATE
+        errors, words = word_errors(reference, transcript) if reference is not None else (None, None)
+        results.append({
+            "file": os.path.basename(path),
+            "transcript": transcript,
+            "reference": reference,
+            "latency": finished - speech_end if speech_end and transcript else None,
+            "cpu_time": cpu_time,
+            "audio_seconds": audio_seconds,
+            "errors": errors,
+            "words": words,
+        })
+        print(f"  {os.path.basename(path)}: {transcript!r}")
+    return results
+
+
+def summarize(results):
+    """Aggregate per-file results into latency, CPU and WER figures"""
+    latencies = [r["latency"] for r in results if r["latency"] is not None]
+    scored = [r for r in results if r["errors"] is not None]
+    total_words = sum(r["words"] for r in scored)
+    audio_seconds = sum(r["audio_seconds"] for r in results)
+    cpu_time = sum(r["cpu_time"] for r in results)
+    return {
+        "files": len(results),
+        "missed": sum(1 for r in results if not r["transcript"]),
+        "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "cpu_time": cpu_time,
+        "cpu_per_audio_second": cpu_time / audio_seconds if audio_seconds else None,
+        "wer": sum(r["errors"] for r in scored) / total_words if total_words else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT latency, CPU time and WER on a WAV corpus")
+    parser.add_argument("corpus", help="WAV file or directory of WAV files with optional .txt references")
+    parser.add_argument("--profile", default=speech_to_text.STT_PROFILE, help="Tuning profile from stt_profiles.json")
+    parser.add_argument("--backend", help="Override the profile's recognizer backend")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay pace relative to real time")
+    parser.add_argument("--speech-start", type=float, help="Override the profile's speech start window")
+    parser.add_argument("--trailing-silence", type=float, help="Override the profile's trailing silence")
+    parser.add_argument("--no-preprocess", action="store_true", help="Disable high-pass filtering and gain control")
+    parser.add_argument("--wake-word", action="store_true", help="Keep the wake word gate enabled")
+    parser.add_argument("--json", help="Write per-file results and the summary to this path")
+    args = parser.parse_args()
+
+    # Endpointing and backend settings under test - replay always uses raw capture
+    speech_to_text.set_active_profile(args.profile)
+    profile = speech_to_text.get_profile()
+    profile.update({"capture": "raw", "wake_word": args.wake_word, "preprocess": not args.no_preprocess})
+    if args.backend:
+        profile["recognizer"] = args.backend
+    if args.speech_start is not None:
+        profile["speech_start"] = args.speech_start
+    if args.trailing_silence is not None:
+        profile["pause_threshold"] = args.trailing_silence
+    speech_to_text.set_active_profile(profile)
+
+    print(f"🎙️ STT benchmark - profile: {profile['name']}, backend: {profile['recognizer']}, speed: {args.speed}x")
+    load_start = time.perf_counter()
+    speech_to_text.get_recognizer_backend()
+    print(f"⏱️ Backend load: {time.perf_counter() - load_start:.3f}s")
+
+    try:
+        results = run_benchmark(args.corpus, speed=args.speed)
+    finally:
+        speech_to_text.close_microphone_stream()
+    summary = summarize(results)
+
+    print("=" * 40)
+    print(f"Files:              {summary['files']} ({summary['missed']} without transcript)")
+    print(f"Latency mean:       {format_value(summary['latency_mean'], 's')}")
+    print(f"Latency p50 / p95:  {format_value(summary['latency_p50'], 's')} / {format_value(summary['latency_p95'], 's')}")
+    print(f"CPU time:           {format_value(summary['cpu_time'], 's')}")
+    print(f"CPU per audio sec:  {format_value(summary['cpu_per_audio_second'])}")
+    print(f"Word error rate:    {format_value(summary['wer'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "profile": profile, "summary": summary, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
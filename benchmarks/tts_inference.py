@@ -0,0 +1,190 @@
+"""
+TTS inference profile benchmark for the Optimus Prime Voice Assistant
+
+Loads YourTTS once per inference profile (fp32, int8) and synthesizes the
+same sentences with each, reporting load time, latency and real-time
+factor. Every non-fp32 profile is compared against the fp32 output with a
+speaker-embedding similarity and a spectral-envelope similarity, so a
+faster profile can be checked for voice quality.
+
+Usage:
+    python -m benchmarks.tts_inference --profiles fp32 int8 --runs 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from benchmarks.stats import percentile, format_value
+from text_to_speech import MODEL_NAME, SPEAKER_WAV, install_speaker_cache, to_pcm16, write_wav
+from tts_inference import configure_threads, apply_inference_profile, INFERENCE_PROFILES
+
+DEFAULT_SENTENCES = [
+    "Opening Safari for you sir!",
+    "I encountered an error while starting the marks monitoring system.",
+    "Hello sir, I am Optimus Prime. How can I assist you?",
+    "The screen shows a research article on battery chemistry. It compares three "
+    "electrolyte formulations and reports that the solid state design keeps its capacity "
+    "for twice as many charge cycles.",
+]
+
+
+def load_model(profile, torchscript=False):
+    """Load a separate YourTTS instance with an inference profile applied"""
+    from TTS.api import TTS
+    tts = TTS(model_name=MODEL_NAME, progress_bar=False, gpu=False)
+    install_speaker_cache(tts, MODEL_NAME)
+    return apply_inference_profile(tts, profile, torchscript)
+
+
+def synthesize_timed(tts, text, seed=0):
+    """(samples, seconds) for one deterministic synthesis"""
+    import torch
+    torch.manual_seed(seed)  # YourTTS samples durations and latents
+    start = time.perf_counter()
+    wav = tts.tts(text=text, speaker_wav=SPEAKER_WAV, language="en")
+    return to_pcm16(wav), time.perf_counter() - start
+
+
+def mean_log_spectrum(samples, n_fft=1024, hop=256):
+    """Average log-magnitude spectrum: the clip's spectral envelope"""
+    signal = samples.astype(np.float32) / 32768.0
+    if signal.size < n_fft:
+        signal = np.pad(signal, (0, n_fft - signal.size))
+    frames = np.lib.stride_tricks.sliding_window_view(signal, n_fft)[::hop]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=1))
+    return np.log(spectrum.mean(axis=0) + 1e-6)
+
+
+def cosine(a, b):
+    a = np.asarray(a, dtype=np.float64).ravel()
+    b = np.asarray(b, dtype=np.float64).ravel()
+    denominator = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denominator) if denominator else 0.0
+
+
+def speaker_embedding(tts, samples, rate):
+    """Speaker encoder embedding of a clip, bypassing the embedding cache"""
+    manager = tts.synthesizer.tts_model.speaker_manager
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        write_wav(path, samples, rate)
+        return type(manager).compute_embedding_from_clip(manager, path)
+    finally:
+        os.remove(path)
+
+
+def run_profile(profile, sentences, runs, torchscript=False):
+    """Load one profile and time every sentence `runs` times"""
+    load_start = time.perf_counter()
+    tts = load_model(profile, torchscript)
+    load_time = time.perf_counter() - load_start
+    rate = tts.synthesizer.output_sample_rate
+
+    results = []
+    for text in sentences:
+        latencies = []
+        samples = None
+        for _ in range(runs):
+            samples, elapsed = synthesize_timed(tts, text)
+            latencies.append(elapsed)
+        duration = samples.size / float(rate)
+        results.append({
+            "text": text,
+            "latencies": latencies,
+            "audio_seconds": duration,
+            "rtf": min(latencies) / duration if duration else None,
+            "samples": samples,
+        })
+        print(f"  [{profile}] {min(latencies):.3f}s for {duration:.2f}s audio: {text[:40]!r}")
+    return tts, rate, load_time, results
+
+
+def compare(reference_tts, rate, reference, candidate):
+    """Similarity of a profile's outputs to the fp32 outputs"""
+    speaker, spectral, length = [], [], []
+    for ref, cand in zip(reference, candidate):
+        speaker.append(cosine(speaker_embedding(reference_tts, ref["samples"], rate),
+                              speaker_embedding(reference_tts, cand["samples"], rate)))
+        ref_spectrum = mean_log_spectrum(ref["samples"])
+        cand_spectrum = mean_log_spectrum(cand["samples"])
+        spectral.append(cosine(ref_spectrum - ref_spectrum.mean(), cand_spectrum - cand_spectrum.mean()))
+        length.append(cand["audio_seconds"] / ref["audio_seconds"])
+    return {
+        "speaker_similarity": min(speaker),
+        "spectral_similarity": min(spectral),
+        "duration_ratio": float(np.mean(length)),
+    }
+
+
+def summarize(load_time, results):
+    latencies = [latency for r in results for latency in r["latencies"]]
+    rtfs = [r["rtf"] for r in results if r["rtf"] is not None]
+    return {
+        "load_time": load_time,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "rtf_mean": sum(rtfs) / len(rtfs) if rtfs else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare YourTTS inference profiles on speed and similarity")
+    parser.add_argument("--profiles", nargs="+", default=list(INFERENCE_PROFILES), choices=INFERENCE_PROFILES)
+    parser.add_argument("--sentences", help="Text file with one sentence per line")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per sentence (best is used for RTF)")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = physical cores)")
+    parser.add_argument("--interop-threads", type=int, default=0, help="Inter-op threads (0 = derived)")
+    parser.add_argument("--torchscript", action="store_true", help="Trace the waveform decoder")
+    parser.add_argument("--json", help="Write per-sentence results and the summary to this path")
+    args = parser.parse_args()
+
+    sentences = DEFAULT_SENTENCES
+    if args.sentences:
+        with open(args.sentences, "r") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+
+    threads, interop = configure_threads(args.threads, args.interop_threads)
+    print(f"🎬 TTS inference benchmark - {len(sentences)} sentences, {threads} threads, {interop} inter-op")
+
+    # fp32 is the quality reference, so it always runs first
+    profiles = ["fp32"] + [p for p in args.profiles if p != "fp32"]
+    summaries = {}
+    reference = None
+    for profile in profiles:
+        tts, rate, load_time, results = run_profile(profile, sentences, args.runs, args.torchscript)
+        summary = summarize(load_time, results)
+        if reference is None:
+            reference = (tts, results)
+        else:
+            summary.update(compare(reference[0], rate, reference[1], results))
+        summaries[profile] = {"summary": summary, "results": results}
+
+    print("=" * 40)
+    for profile, data in summaries.items():
+        summary = data["summary"]
+        print(f"{profile}:")
+        print(f"  Load time:            {format_value(summary['load_time'], 's')}")
+        print(f"  Latency p50 / p95:    {format_value(summary['latency_p50'], 's')} / {format_value(summary['latency_p95'], 's')}")
+        print(f"  Real-time factor:     {format_value(summary['rtf_mean'])}")
+        if "speaker_similarity" in summary:
+            print(f"  Speaker similarity:   {format_value(summary['speaker_similarity'])} (min vs fp32)")
+            print(f"  Spectral similarity:  {format_value(summary['spectral_similarity'])} (min vs fp32)")
+            print(f"  Duration ratio:       {format_value(summary['duration_ratio'])}")
+
+    if args.json:
+        for data in summaries.values():
+            for result in data["results"]:
+                result.pop("samples", None)
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "profiles": summaries}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
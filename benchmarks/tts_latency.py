@@ -0,0 +1,181 @@
+"""
+Text-to-speech latency benchmark for the Optimus Prime Voice Assistant
+
+Measures YourTTS cold-load time, the first synthesis after loading and
+warm per-call latency and real-time factor for representative reply
+lengths: acknowledgements, errors and summary paragraphs. Peak RSS is
+reported as well. The speech cache is bypassed so every call runs the
+model, with the inference profile and thread settings from the environment
+(see tts_inference).
+
+Results can be saved as a baseline and later runs gated against it: the
+exit status is 1 when latency, RTF or memory regress beyond the tolerance.
+
+Usage:
+    python -m benchmarks.tts_latency --runs 5 --save-baseline tts_baseline.json
+    OPTIMUS_TTS_PROFILE=int8 python -m benchmarks.tts_latency --baseline tts_baseline.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stats import percentile, format_value
+from benchmarks.tts_inference import synthesize_timed
+from text_to_speech import get_tts_instance
+from tts_inference import TTS_INFERENCE_PROFILE
+
+DEFAULT_CORPUS = {
+    "acknowledgement": [
+        "Opening Safari for you sir!",
+        "Playing Bohemian Rhapsody for you sir!",
+        "Closing chatbox for you sir!",
+    ],
+    "error": [
+        "I didn't get the command sir. Please try to say it again.",
+        "I encountered an error while starting Bluetooth and connecting to JBL Tune 520BT.",
+    ],
+    "summary": [
+        "The screen shows a research article on battery chemistry. It compares three "
+        "electrolyte formulations and reports that the solid state design keeps its capacity "
+        "for twice as many charge cycles, at the cost of a slower charge rate.",
+    ],
+}
+
+# Metrics compared against a baseline, all lower-is-better
+GATED_METRICS = ("latency_p95", "rtf_p95", "first_call", "peak_rss_mb")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_corpus(path):
+    """{category: [sentences]} from a JSON file, or the built-in corpus"""
+    if not path:
+        return DEFAULT_CORPUS
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def run_benchmark(corpus, runs):
+    """Cold-load the model, then time every sentence `runs` times"""
+    load_start = time.perf_counter()
+    tts = get_tts_instance()
+    load_time = time.perf_counter() - load_start
+    rate = tts.synthesizer.output_sample_rate
+
+    first_call = None
+    categories = {}
+    for category, sentences in corpus.items():
+        calls = []
+        for text in sentences:
+            for run in range(runs):
+                samples, elapsed = synthesize_timed(tts, text, seed=run)
+                duration = samples.size / float(rate)
+                if first_call is None:
+                    # The first synthesis pays for lazy initialization inside torch
+                    first_call = elapsed
+                    continue
+                calls.append({"text": text, "latency": elapsed, "audio_seconds": duration,
+                              "rtf": elapsed / duration if duration else None})
+            print(f"  [{category}] {text[:50]!r}")
+        categories[category] = calls
+    return load_time, first_call, categories
+
+
+def summarize_calls(calls):
+    latencies = [c["latency"] for c in calls]
+    rtfs = [c["rtf"] for c in calls if c["rtf"] is not None]
+    return {
+        "calls": len(calls),
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "rtf_mean": sum(rtfs) / len(rtfs) if rtfs else None,
+        "rtf_p95": percentile(rtfs, 0.95),
+    }
+
+
+def summarize(load_time, first_call, categories):
+    all_calls = [call for calls in categories.values() for call in calls]
+    summary = summarize_calls(all_calls)
+    summary.update({
+        "load_time": load_time,
+        "first_call": first_call,
+        "peak_rss_mb": peak_rss_mb(),
+        "categories": {category: summarize_calls(calls) for category, calls in categories.items()},
+    })
+    return summary
+
+
+def check_regressions(summary, baseline, tolerance):
+    """Gated metrics that exceed the baseline by more than `tolerance`"""
+    regressions = []
+    scopes = [("overall", summary, baseline)]
+    for category, values in summary["categories"].items():
+        if category in baseline.get("categories", {}):
+            scopes.append((category, values, baseline["categories"][category]))
+    for scope, current, reference in scopes:
+        for metric in GATED_METRICS:
+            value, limit = current.get(metric), reference.get(metric)
+            if value is None or not limit:
+                continue
+            if value > limit * (1 + tolerance):
+                regressions.append(f"{scope} {metric}: {value:.3f} > {limit:.3f} (+{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTS load time, latency, real-time factor and memory")
+    parser.add_argument("--corpus", help='JSON file of {"category": ["sentence", ...]}')
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per sentence")
+    parser.add_argument("--baseline", help="Fail when results regress against this saved summary")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression as a fraction")
+    parser.add_argument("--save-baseline", help="Write the summary to this path for later gating")
+    parser.add_argument("--json", help="Write per-call results and the summary to this path")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"🎬 TTS latency benchmark - profile: {TTS_INFERENCE_PROFILE}, runs: {args.runs}")
+    load_time, first_call, categories = run_benchmark(corpus, args.runs)
+    summary = summarize(load_time, first_call, categories)
+
+    print("=" * 40)
+    print(f"Cold load:          {format_value(summary['load_time'], 's')}")
+    print(f"First call:         {format_value(summary['first_call'], 's')}")
+    print(f"Peak RSS:           {summary['peak_rss_mb']:.0f} MB")
+    for category, values in summary["categories"].items():
+        print(f"{category}:")
+        print(f"  Latency p50 / p95:  {format_value(values['latency_p50'], 's')} / {format_value(values['latency_p95'], 's')}")
+        print(f"  RTF mean / p95:     {format_value(values['rtf_mean'])} / {format_value(values['rtf_p95'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "profile": TTS_INFERENCE_PROFILE,
+                       "summary": summary, "results": categories}, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = check_regressions(summary, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
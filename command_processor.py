@@ -2,26 +2,68 @@
 Command processing module for the Optimus Prime Voice Assistant
 """
 import subprocess
-import os
 import re
 import threading
 import time
 import re
 import threading
 import time
-from app_launcher import open_app, close_app, play_music, monitor_music_playback, start_monitor_marks, stop_monitor_marks , search_safari, open_chatbox, close_chatbox, summarize_screen, start_bluetooth
-from functions.messenger import Messenger
-from speech_to_text import microphone_active
-from text_to_speech import get_tts_instance
-from functions.file_operations import perform_file_operation
+from app_launcher import open_app, close_app, play_music, monitor_music_playback, start_monitor_marks, stop_monitor_marks , search_safari, open_chatbox, close_chatbox, summarize_screen, start_bluetooth, perform_file_operation
+from speech_to_text import microphone_state
+from tts_worker import preload_tts, PRIORITY_ACK, PRIORITY_ERROR
 
 
 class CommandProcessor:
+    # Said after the wake word. "transform optimus" ends with the wake word, so
+    # the detector takes it as a new wake-up: it only works with
+    # OPTIMUS_WAKE_WORD_GATE=0, the others work either way
+    EXIT_PHRASES = ("transform and roll out", "transform and rollout", "transform optimus")
+
+    # Every reply the assistant speaks; templates take one slot filled at runtime
+    RESPONSES = {
+        "welcome": "Hello sir, I am Optimus Prime. How can I assist you?",
+        "search_safari": "Searching Safari for {query} sir!",
+        "search_safari_error": "I encountered an error while searching in Safari.",
+        "summarize_screen": "Summarizing image for you sir!",
+        "monitor_marks": "Starting marks monitoring system for you sir!",
+        "monitor_marks_error": "I encountered an error while starting the marks monitoring system.",
+        "stop_monitor_marks": "Stopping marks monitoring system for you sir!",
+        "stop_monitor_marks_error": "No active marks monitoring system is running.",
+        "start_bluetooth": "Starting Bluetooth and connecting to JBL Tune 520BT for you sir!",
+        "start_bluetooth_error": "I encountered an error while starting Bluetooth and connecting to JBL Tune 520BT.",
+        "open_chatbox": "Opening chatbox for you sir!",
+        "close_chatbox": "Closing chatbox for you sir!",
+        "exit": "Rollouting Sir! Good bye...",
+        "play_music": "Playing {song} for you sir!",
+        "song_not_found": "There is no song with name {song} in your Music library, sir",
+        "navigate": "Going to {path} for you, sir!",
+        "file_operation": "{result}, sir!",
+        "file_operation_error": "Error with file operation: {error}, sir!",
+        "send_message": "Sending message to {contact} for you sir!",
+        "open_app": "Opening {app} for you sir!",
+        "close_app": "Closing {app} for you sir!",
+        "not_understood": "I didn't get the command sir. Please try to say it again.",
+    }
+
+    @classmethod
+    def static_phrases(cls):
+        """Replies without a runtime slot - these can be synthesized ahead of time"""
+        return [text for text in cls.RESPONSES.values() if "{" not in text]
+
     def __init__(self, audio_handler, tts_handler, electron_controller):
         self.audio_handler = audio_handler
         self.tts_handler = tts_handler
         self.electron_controller = electron_controller
-        self.messenger = Messenger()
+        self._messenger = None
+        self._warmed_intents = set()
+
+    @property
+    def messenger(self):
+        """Created on first message: Messenger builds a ChatService and loads its history"""
+        if self._messenger is None:
+            from functions.messenger import Messenger
+            self._messenger = Messenger()
+        return self._messenger
 
     def extract_music_command(self, command):
         """
@@ -88,10 +130,63 @@ class CommandProcessor:
         
         return None
 
+    def classify_intent(self, command):
+        """
+        Cheap intent guess used on partial transcripts, before the final one arrives
+        """
+        command = command.lower()
+        if "summarise" in command or "summarize" in command or "chat box" in command:
+            return "llm"
+        if self.extract_music_command(command):
+            return "music"
+        if re.search(r"\b(?:message|whatsapp)\b", command):
+            return "message"
+        if self.extract_app_name(command):
+            return "app"
+        return None
+
+    def prewarm(self, partial_command):
+        """
+        Start warming the handler a partial transcript points at so it is
+        ready by the time the final transcript is processed
+        """
+        intent = self.classify_intent(partial_command)
+        if intent is None or intent in self._warmed_intents:
+            return
+        self._warmed_intents.add(intent)
+        print(f"🔥 Warming up for '{intent}' command")
+        threading.Thread(target=self._warm_intent, args=(intent,), daemon=True).start()
+
+    def _warm_intent(self, intent):
+        """Background warm-up for a pre-classified intent"""
+        try:
+            if intent == "music":
+                # Launch the Music app hidden so playback starts without the app cold start
+                subprocess.run(["open", "-g", "-a", "Music"], check=False, capture_output=True, timeout=5)
+            elif intent == "message":
+                subprocess.run(["open", "-g", "-a", "WhatsApp"], check=False, capture_output=True, timeout=5)
+            elif intent == "llm":
+                # An empty generate request makes Ollama load the model into memory
+                import json
+                import urllib.request
+                request = urllib.request.Request(
+                    "http://localhost:11434/api/generate",
+                    data=json.dumps({"model": "mistral:instruct"}).encode(),
+                    headers={"Content-Type": "application/json"}
+                )
+                urllib.request.urlopen(request, timeout=30).read()
+            # Replies always go through TTS - make sure the model is loaded
+            preload_tts()
+        except Exception as e:
+            print(f"⚠️ Warm-up for '{intent}' failed: {e}")
+
     def process_command(self, command):
         """
         Process the recognized voice command
         """
+        # Partial-transcript warm-ups belong to the utterance that just ended
+        self._warmed_intents.clear()
+
         if not command:
             # Pause animation when no command is received
             if self.electron_controller:
@@ -100,20 +195,21 @@ class CommandProcessor:
         
         if "search safari for" in command.lower():
             search_query = command.lower().split("search safari for",1)[1].strip()
-            response = f"Searching Safari for {search_query} sir!"
+            template, slots = self.RESPONSES["search_safari"], {"query": search_query}
+            response = template.format(**slots)
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_template(template, slots, self.electron_controller, priority=PRIORITY_ACK)
             success = search_safari(search_query)
             if not success:
-                error_response = "I encountered an error while searching in Safari."
-                self.tts_handler.speak_text_clean(error_response, self.electron_controller)
+                error_response = self.RESPONSES["search_safari_error"]
+                self.tts_handler.speak_text_clean(error_response, self.electron_controller, priority=PRIORITY_ERROR)
             return True  # Continue listening
         
         # Check for screen summarization command
         if "summarise screen" in command.lower() or "summarise current screen" in command.lower():
-            response = "Summarizing image for you sir!"
+            response = self.RESPONSES["summarize_screen"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             
             # Get summary from screen
             summary = summarize_screen()
@@ -124,35 +220,35 @@ class CommandProcessor:
         
         # Check for monitor marks command
         if "monitor marks" in command.lower():
-            response = "Starting marks monitoring system for you sir!"
+            response = self.RESPONSES["monitor_marks"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             success = start_monitor_marks()
             if not success:
-                error_response = "I encountered an error while starting the marks monitoring system."
-                self.tts_handler.speak_text_clean(error_response, self.electron_controller)
+                error_response = self.RESPONSES["monitor_marks_error"]
+                self.tts_handler.speak_text_clean(error_response, self.electron_controller, priority=PRIORITY_ERROR)
             return True  # Continue listening
 
         # Check for stop monitoring marks command
         if "stop monitoring marks" in command.lower():
-            response = "Stopping marks monitoring system for you sir!"
+            response = self.RESPONSES["stop_monitor_marks"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             success = stop_monitor_marks()
             if not success:
-                response = "No active marks monitoring system is running."
-                self.tts_handler.speak_text_clean(response, self.electron_controller)
+                response = self.RESPONSES["stop_monitor_marks_error"]
+                self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ERROR)
             return True  # Continue listening
 
         # Check for start bluetooth command
         if "start bluetooth" in command.lower():
-            response = "Starting Bluetooth and connecting to JBL Tune 520BT for you sir!"
+            response = self.RESPONSES["start_bluetooth"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             success = start_bluetooth()
             if not success:
-                error_response = "I encountered an error while starting Bluetooth and connecting to JBL Tune 520BT."
-                self.tts_handler.speak_text_clean(error_response, self.electron_controller)
+                error_response = self.RESPONSES["start_bluetooth_error"]
+                self.tts_handler.speak_text_clean(error_response, self.electron_controller, priority=PRIORITY_ERROR)
             return True  # Continue listening
 
         
@@ -160,31 +256,32 @@ class CommandProcessor:
         
         # Check for open chatbox command
         if "open chat box" in command.lower():
-            response = "Opening chatbox for you sir!"
+            response = self.RESPONSES["open_chatbox"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             open_chatbox()
             return True  # Continue listening
         
         # Check for close chatbox command
         if "close chat box" in command.lower():
-            response = "Closing chatbox for you sir!"
+            response = self.RESPONSES["close_chatbox"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             close_chatbox()
-            return True  # Continue listening        if "transform optimus" in command.lower():
+            return True  # Continue listening
         
         # Check for exit command
-        if "transform optimus" in command.lower():
-            response = "Rollouting Sir! Good bye..."
+        if any(phrase in command.lower() for phrase in self.EXIT_PHRASES):
+            response = self.RESPONSES["exit"]
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ACK)
             return False  # Stop listening
         
         # Check for music commands
         song_name = self.extract_music_command(command)
         if song_name:
-            response = f"Playing {song_name} for you sir!"
+            template, slots = self.RESPONSES["play_music"], {"song": song_name}
+            response = template.format(**slots)
             print(f"🤖 {response}")
             
             # Start music playback with proper TTS and timing
@@ -192,31 +289,11 @@ class CommandProcessor:
                 # Set the music playing flag to prevent microphone from starting/stopping
                 self.audio_handler.is_music_playing.set()
                 # Stop microphone completely during music playback
-                microphone_active.clear()
+                microphone_state.deactivate()
                 
                 try:
                     # Step 1: Play TTS response without microphone interference
-                    print(f"🗣️ Speaking: {response}")
-                    
-                    # Generate and play TTS without microphone management
-                    speaker_wav = "optimus-clear_nZx1aJFy.wav"
-                    output_path = "response.wav"
-                    
-                    if os.path.exists(speaker_wav):
-                        # DIRECT TTS CALL - exactly like text_to_speech.py
-                        tts = get_tts_instance()
-                        tts.tts_to_file(
-                            text=response,
-                            speaker_wav=speaker_wav,
-                            language="en",
-                            file_path=output_path
-                        )
-                        
-                        # Additional wait for file to be completely written by the TTS process
-                        time.sleep(0.5)  # Wait for TTS process to finish writing
-                        
-                        # Direct audio playback
-                        self.audio_handler.play_audio_file(output_path, speed=0.9, quality=1)
+                    self.tts_handler.speak_template(template, slots, priority=PRIORITY_ACK, speed=0.9)
                     
                     # Step 2: Wait 1 second after TTS completes
                     print("⏳ Waiting 1 second before starting music...")
@@ -233,24 +310,11 @@ class CommandProcessor:
                         monitor_music_playback()
                     else:
                         # Song not found - play error message
-                        error_response = f"There is no song with name {song_name} in your Music library, sir"
+                        error_template, error_slots = self.RESPONSES["song_not_found"], {"song": song_name}
+                        error_response = error_template.format(**error_slots)
                         print(f"🤖 {error_response}")
                         
-                        # DIRECT TTS CALL for error message
-                        if os.path.exists(speaker_wav):
-                            tts = get_tts_instance()
-                            tts.tts_to_file(
-                                text=error_response,
-                                speaker_wav=speaker_wav,
-                                language="en",
-                                file_path=output_path
-                            )
-                            
-                            # Additional wait for file to be completely written by the TTS process
-                            time.sleep(0.5)  # Wait for TTS process to finish writing
-                            
-                            # Direct audio playback
-                            self.audio_handler.play_audio_file(output_path, speed=1.0, quality=1)
+                        self.tts_handler.speak_template(error_template, error_slots, priority=PRIORITY_ERROR)
     
                 except Exception as e:
                     print(f"❌ Music playback error: {e}")
@@ -258,7 +322,7 @@ class CommandProcessor:
                     # Always clear the music playing flag when music playback is done
                     self.audio_handler.is_music_playing.clear()
                     # Resume microphone after music playback
-                    microphone_active.set()
+                    microphone_state.activate()
                  
             
             # Start music with TTS in independent thread
@@ -285,17 +349,20 @@ class CommandProcessor:
                 # Check if this is a navigation command (returns a path instead of operation result)
                 if result.startswith("Navigation path: "):
                     path = result.replace("Navigation path: ", "").strip()
-                    response = f"Going to {path} for you, sir!"
+                    template, slots = self.RESPONSES["navigate"], {"path": path}
+                    response = template.format(**slots)
                 else:
-                    response = f"{result}, sir!"
+                    template, slots = self.RESPONSES["file_operation"], {"result": result}
+                    response = template.format(**slots)
                 
                 print(f"🤖 {response}")
-                self.tts_handler.speak_text_clean(response, self.electron_controller)
+                self.tts_handler.speak_template(template, slots, self.electron_controller)
                 return True
             except Exception as e:
-                response = f"Error with file operation: {str(e)}, sir!"
+                template, slots = self.RESPONSES["file_operation_error"], {"error": str(e)}
+                response = template.format(**slots)
                 print(f"🤖 {response}")
-                self.tts_handler.speak_text_clean(response, self.electron_controller)
+                self.tts_handler.speak_template(template, slots, self.electron_controller, priority=PRIORITY_ERROR)
                 return True
         
         # Check for WhatsApp message commands
@@ -308,9 +375,10 @@ class CommandProcessor:
             contact_name = re.sub(r"\s+for\s+me.*$", "", contact_name)
             message = re.sub(r"\s+for\s+me.*$", "", message)
 
-            response = f"Sending message to {contact_name} for you sir!"
+            template, slots = self.RESPONSES["send_message"], {"contact": contact_name}
+            response = template.format(**slots)
             print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_template(template, slots, self.electron_controller, priority=PRIORITY_ACK)
             # Use the messenger's process_message_request instead of direct send_whatsapp_message
             result = self.messenger.process_message_request(command)
             print(f"Message result: {result}")
@@ -323,19 +391,21 @@ class CommandProcessor:
             action, app_name = action_info
             
             if action == "open":
-                response = f"Opening {app_name} for you sir!"
+                template, slots = self.RESPONSES["open_app"], {"app": app_name}
+                response = template.format(**slots)
                 print(f"🤖 {response}")
-                self.tts_handler.speak_text_clean(response, self.electron_controller)
+                self.tts_handler.speak_template(template, slots, self.electron_controller, priority=PRIORITY_ACK)
                 open_app(app_name)
             elif action == "close":
-                response = f"Closing {app_name} for you sir!"
+                template, slots = self.RESPONSES["close_app"], {"app": app_name}
+                response = template.format(**slots)
                 print(f"🤖 {response}")
-                self.tts_handler.speak_text_clean(response, self.electron_controller)
+                self.tts_handler.speak_template(template, slots, self.electron_controller, priority=PRIORITY_ACK)
                 close_app(app_name)
         else:
-            response = "I didn't get the command sir. Please try to say it again."
+            response = self.RESPONSES["not_understood"]
             # print(f"🤖 {response}")
-            self.tts_handler.speak_text_clean(response, self.electron_controller)
+            self.tts_handler.speak_text_clean(response, self.electron_controller, priority=PRIORITY_ERROR)
         
         return True  # Continue listening
 
@@ -1,56 +1,108 @@
+import sys
+import threading
 import time
+from startup_profiler import startup_profiler
+
+# --profile-startup prints a per-import and per-initializer timing tree
+# from here to the first listen
+if "--profile-startup" in sys.argv:
+    startup_profiler.enable()
+
 # Import our custom modules
-from speech_to_text import listen_for_command
+from speech_to_text import listen_for_command, close_microphone_stream, get_recognizer_backend, get_wake_word_detector, WAKE_WORD, WAKE_WORD_GATE, microphone_state
 # Import our new modules
 from audio_handler import AudioHandler
 from tts_handler import TTSHandler
 from command_processor import CommandProcessor
 from system_optimizer import SystemOptimizer
+from barge_in import BargeInMonitor
+from phrase_warmer import PhraseWarmer
+from phrase_splicer import template_fragments
+from tts_worker import shutdown_tts_worker
+from tts_tiers import tts_metrics
 # Import Electron controller
 from electron_controller import ElectronController
 
 
+def preload_speech_recognition():
+    """Load the recognizer backend, then the wake word detector that shares its model"""
+    try:
+        get_recognizer_backend()
+        get_wake_word_detector()
+    except Exception as e:
+        print(f"⚠️ Speech recognition preload failed: {e}")
+
+
 def main():
     """
     Main voice assistant loop with optimized performance
     """
     # Optimize system performance first
-    SystemOptimizer.optimize_system_performance()
+    with startup_profiler.step("SystemOptimizer.optimize_system_performance"):
+        SystemOptimizer.optimize_system_performance()
+    
+    # Load the speech recognizer backend in the background so the first command
+    # doesn't pay for it; the first listen waits for it if it is still loading
+    threading.Thread(target=preload_speech_recognition, name="stt-preload", daemon=True).start()
     
     # Initialize audio handler for audio-related functionality
-    audio_handler = AudioHandler()
+    with startup_profiler.step("AudioHandler"):
+        # The listen pre-roll must not reach back into the assistant's own voice
+        audio_handler = AudioHandler(on_playback_idle=microphone_state.mark_playback_end)
+    
+    # Load the TTS model and pre-synthesize the fixed replies in the background,
+    # welcome message first, while Electron starts and the first listen begins
+    with startup_profiler.step("PhraseWarmer.start"):
+        phrase_warmer = PhraseWarmer(
+            CommandProcessor.static_phrases(), audio_handler,
+            fragments=template_fragments(CommandProcessor.RESPONSES.values())
+        )
+        phrase_warmer.start()
     
     # Initialize Electron controller
     electron_controller = ElectronController()
     
     # Start Electron app    
-    if not electron_controller.start_electron_app():
-        print("❌ Failed to start 3D animation. Continuing without it.")
+    with startup_profiler.step("ElectronController.start_electron_app"):
+        if not electron_controller.start_electron_app():
+            print("❌ Failed to start 3D animation. Continuing without it.")
     
     # Initialize TTS handler with the audio handler
-    tts_handler = TTSHandler(audio_handler)
+    with startup_profiler.step("TTSHandler"):
+        tts_handler = TTSHandler(audio_handler)
     
     # Initialize command processor with needed handlers
-    command_processor = CommandProcessor(audio_handler, tts_handler, electron_controller)
+    with startup_profiler.step("CommandProcessor"):
+        command_processor = CommandProcessor(audio_handler, tts_handler, electron_controller)
+    
+    # Let the user interrupt the assistant while it is speaking
+    with startup_profiler.step("BargeInMonitor.start"):
+        barge_in_monitor = BargeInMonitor(audio_handler, tts_handler)
+        barge_in_monitor.start()
     
     print("🤖 Optimus Prime Voice Assistant")
     print("=" * 40)
-    print("🎙️ Say 'Transform and Rollout' to exit the assistant")
+    wake = f"{WAKE_WORD.title()}, " if WAKE_WORD_GATE else ""
+    if WAKE_WORD_GATE:
+        print(f"👂 Start every command with the wake word '{WAKE_WORD.title()}' (when a Vosk model is available)")
+    print(f"🎙️ Say '{wake}Transform and Rollout' to exit the assistant")
     print("🗣️ Example commands:")
-    print("   - 'Open WhatsApp for me'")
-    print("   - 'Close Safari'")
-    print("   - 'Launch Visual Studio Code'")
-    print("   - 'Play Bohemian Rhapsody'")
-    print("   - 'Listen to some jazz'")
-    print("   - 'Message John with Hello there'")
-    print("   - 'Send a message to Jane saying How are you?'")
-    print("   - 'Transform and Rollout'")
+    print(f"   - '{wake}Open WhatsApp for me'")
+    print(f"   - '{wake}Close Safari'")
+    print(f"   - '{wake}Launch Visual Studio Code'")
+    print(f"   - '{wake}Play Bohemian Rhapsody'")
+    print(f"   - '{wake}Listen to some jazz'")
+    print(f"   - '{wake}Message John with Hello there'")
+    print(f"   - '{wake}Send a message to Jane saying How are you?'")
+    print(f"   - '{wake}Transform and Rollout'")
     print("=" * 40)
     
     # Welcome message (make it shorter for quicker startup)
-    welcome_msg = "Hello sir, I am Optimus Prime. How can I assist you?"
+    welcome_msg = CommandProcessor.RESPONSES["welcome"]
     print(f"🤖 {welcome_msg}")
-    tts_handler.speak_text_clean(welcome_msg, electron_controller)
+    with startup_profiler.step("welcome message"):
+        tts_handler.speak_text_clean(welcome_msg, electron_controller)
+    startup_profiler.report("first listen")
     
     # Track time since last user interaction
     last_interaction_time = time.time()
@@ -73,14 +125,10 @@ def main():
 
             # Handle listening based on current state (TTS vs music vs normal)
             if audio_handler.is_audio_playing.is_set():
-                # During TTS playback, microphone is managed by the TTS functions
-                # We still attempt to listen but with caution
+                # While the assistant speaks, the barge-in monitor owns the
+                # microphone; an interruption is picked up by the next listen
                 command = None
-                try:
-                    # Try to listen with shorter timeout during TTS
-                    command = listen_for_command()
-                except:
-                    pass
+                time.sleep(0.05)
             elif audio_handler.is_music_playing.is_set():
                 # During music playback, completely stop listening to prevent volume fluctuations
                 # Music should play without any microphone interference
@@ -90,7 +138,12 @@ def main():
                 time.sleep(0.2)  # Longer pause to reduce CPU usage during music
             else:
                 # Normal listening when neither TTS nor music is playing
-                command = listen_for_command()
+                # Partial transcripts let the command processor warm up early
+                # After a barge-in, listening resumes where the user started talking
+                command = listen_for_command(
+                    on_partial=command_processor.prewarm,
+                    start_seq=barge_in_monitor.take_start_seq()
+                )
 
             # Check for inactivity timeout
             current_time = time.time()
@@ -99,6 +152,10 @@ def main():
                 if electron_controller:
                     electron_controller.pause_animation()
 
+            # A new command ends the interruption - speech is allowed again
+            if command is not None:
+                tts_handler.reset_cancel()
+
             if not command_processor.process_command(command):
                 break
 
@@ -106,7 +163,13 @@ def main():
             if command is not None:
                 last_interaction_time = time.time()
     finally:
-        # Cleanup: Stop Electron app when exiting
+        # Cleanup: Release the microphone and stop Electron app when exiting
+        phrase_warmer.stop()
+        barge_in_monitor.stop()
+        close_microphone_stream()
+        audio_handler.close()
+        shutdown_tts_worker()
+        tts_metrics.report()
         if electron_controller:
             electron_controller.stop_electron_app()
 
@@ -0,0 +1,163 @@
+"""
+Persistent microphone capture module for the Optimus Prime Voice Assistant
+"""
+import threading
+import time
+from audio_sources import PyAudioSource
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring of audio chunks backed by one preallocated bytearray.
+    Every chunk gets a monotonically increasing sequence number so several
+    consumers can read at their own pace; the oldest chunks are overwritten.
+    """
+
+    def __init__(self, capacity, chunk_bytes):
+        self.capacity = capacity
+        self.chunk_bytes = chunk_bytes
+        self._data = bytearray(capacity * chunk_bytes)
+        self._view = memoryview(self._data)
+        self._lengths = [0] * capacity
+        self._next_seq = 0
+        self._condition = threading.Condition()
+
+    def append(self, data):
+        """Copy a chunk into its slot, overwriting the oldest one when the ring is full"""
+        nbytes = min(len(data), self.chunk_bytes)
+        with self._condition:
+            slot = self._next_seq % self.capacity
+            offset = slot * self.chunk_bytes
+            self._view[offset:offset + nbytes] = data[:nbytes]
+            self._lengths[slot] = nbytes
+            self._next_seq += 1
+            self._condition.notify_all()
+
+    def latest_seq(self):
+        """Sequence number the next appended chunk will get"""
+        with self._condition:
+            return self._next_seq
+
+    def oldest_seq(self):
+        """Sequence number of the oldest chunk still held in the ring"""
+        with self._condition:
+            return max(0, self._next_seq - self.capacity)
+
+    def readinto(self, seq, buffer, timeout=None):
+        """
+        Copy the requested chunk into `buffer`, waiting for it if needed.
+        If the chunk was already overwritten the oldest available one is used.
+        Returns (seq, nbytes) - nbytes is 0 on timeout.
+        """
+        with self._condition:
+            if seq >= self._next_seq:
+                self._condition.wait_for(lambda: seq < self._next_seq, timeout=timeout)
+                if seq >= self._next_seq:
+                    return seq, 0
+            seq = max(seq, self._next_seq - self.capacity)
+            slot = seq % self.capacity
+            offset = slot * self.chunk_bytes
+            nbytes = self._lengths[slot]
+            buffer[:nbytes] = self._view[offset:offset + nbytes]
+            return seq, nbytes
+
+
+class AudioFrameBuffer:
+    """
+    Preallocated capture buffer for a single utterance.
+    Chunks are read straight into the next free slot and backends get a
+    memoryview of the captured audio, so nothing is joined or copied.
+    """
+
+    def __init__(self, max_bytes):
+        self._data = bytearray(max_bytes)
+        self._view = memoryview(self._data)
+        self.length = 0
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def reset(self):
+        """Forget the previous utterance, keeping the allocation"""
+        self.length = 0
+
+    def next_slot(self, nbytes):
+        """Writable view of the next `nbytes`, or None when the buffer is full"""
+        if self.length + nbytes > len(self._data):
+            return None
+        return self._view[self.length:self.length + nbytes]
+
+    def commit(self, nbytes):
+        """Mark `nbytes` written into the last slot as captured"""
+        self.length += nbytes
+
+    def getbuffer(self):
+        """Zero-copy view of the captured audio"""
+        return self._view[:self.length]
+
+
+class MicrophoneStream:
+    """
+    Long-lived capture stream.
+    The audio source (the microphone unless another one is given) is opened
+    once and writes every chunk into a ring buffer from its own thread;
+    consumers take utterances from the buffer with pre-roll. An optional
+    preprocessor cleans each chunk before it is stored.
+    """
+
+    def __init__(self, rate, chunk, channels, sample_format, sample_width=2, buffer_seconds=10.0,
+                 source=None, preprocessor=None):
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self.chunk_bytes = chunk * channels * sample_width
+        self.buffer = AudioRingBuffer(max(1, int(rate / chunk * buffer_seconds)), self.chunk_bytes)
+        self.source = source or PyAudioSource(rate, chunk, channels, sample_format)
+        self.preprocessor = preprocessor
+        self._lock = threading.Lock()
+
+    def _on_chunk(self, data):
+        """Called from the source thread for every captured chunk"""
+        if self.preprocessor is not None:
+            data = self.preprocessor.process(data)
+        self.buffer.append(data)
+
+    def start(self):
+        """Start the source once; later calls are no-ops while it is capturing"""
+        with self._lock:
+            if self.source.is_active():
+                return
+            self.source.start(self._on_chunk)
+            print(f"🎙️ Capture stream started ({self.source.name})")
+
+    def stop(self):
+        """Stop capturing and release the source"""
+        with self._lock:
+            self.source.stop()
+
+    def is_active(self):
+        """Check whether the source is currently capturing"""
+        return self.source.is_active()
+
+    def cursor(self, pre_roll=0.0, not_before=None):
+        """
+        Sequence number to start reading from, reaching back `pre_roll` seconds
+        but never to audio captured before the perf_counter time `not_before`
+        """
+        pre_roll_chunks = int(self.rate / self.chunk * pre_roll)
+        if not_before is not None:
+            # The newest chunk ends now; count back the chunks fully after not_before
+            since_chunks = int((time.perf_counter() - not_before) * self.rate / self.chunk) - 1
+            pre_roll_chunks = min(pre_roll_chunks, max(0, since_chunks))
+        return max(self.buffer.oldest_seq(), self.buffer.latest_seq() - pre_roll_chunks)
+
+    def readinto(self, seq, buffer, timeout=0.5):
+        """
+        Copy the chunk at `seq` into `buffer`.
+        Returns (next_seq, nbytes), or (seq, 0) on timeout.
+        """
+        seq, nbytes = self.buffer.readinto(seq, buffer, timeout=timeout)
+        if nbytes == 0:
+            return seq, 0
+        return seq + 1, nbytes
@@ -0,0 +1,95 @@
+"""
+Phrase splicing module for the Optimus Prime Voice Assistant
+"""
+import re
+import numpy as np
+from audio_preprocessing import frame_rms
+from text_to_speech import split_sentences
+
+SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def _fixed_text(fragment):
+    """Fixed template text as it is synthesized on its own"""
+    return fragment.strip().lstrip(",;:").strip()
+
+
+def split_template(template, slots):
+    """
+    Break a reply template into spoken parts: fixed text and filled-in slot
+    values, in order. Returns a list of (text, is_fixed) pairs. Long slot
+    values are split into sentences, like any other reply.
+    """
+    parts = []
+    position = 0
+    for match in SLOT_PATTERN.finditer(template):
+        fixed = _fixed_text(template[position:match.start()])
+        if fixed:
+            parts.append((fixed, True))
+        value = str(slots[match.group(1)]).strip()
+        if value:
+            parts.extend((sentence, False) for sentence in split_sentences(value))
+        position = match.end()
+    fixed = _fixed_text(template[position:])
+    if fixed:
+        parts.append((fixed, True))
+    return parts
+
+
+def template_fragments(templates):
+    """Fixed parts of all slotted templates - these can be synthesized ahead of time"""
+    fragments = []
+    for template in templates:
+        if SLOT_PATTERN.search(template):
+            fragments.extend(_fixed_text(part) for part in SLOT_PATTERN.split(template)[::2])
+    return [fragment for fragment in dict.fromkeys(fragments) if fragment]
+
+
+def trim_silence(samples, rate, threshold=0.05, padding=0.03):
+    """Cut leading and trailing silence, keeping `padding` seconds around the speech"""
+    frame = max(1, int(rate * 0.01))
+    levels = frame_rms(samples.astype(np.float32), frame)
+    voiced = np.flatnonzero(levels > levels.max() * threshold)
+    if voiced.size == 0:
+        return samples
+    pad = int(rate * padding)
+    start = max(0, voiced[0] * frame - pad)
+    end = min(samples.size, (voiced[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+
+def speech_rms(samples, rate):
+    """Loudness of the voiced frames of a clip"""
+    levels = frame_rms(samples.astype(np.float32), max(1, int(rate * 0.01)))
+    voiced = levels[levels > levels.max() * 0.1]
+    return float(np.sqrt(np.mean(voiced * voiced))) if voiced.size else 0.0
+
+
+def splice(pieces, rate, reference=None, crossfade=0.015, max_gain=2.0):
+    """
+    Join separately synthesized clips into one utterance. Each clip is
+    trimmed, brought to the loudness of the `reference` clips (indices of
+    the fixed parts; all clips if None) and overlapped with a short
+    raised-cosine crossfade.
+    """
+    pieces = [trim_silence(np.asarray(piece, dtype=np.int16), rate).astype(np.float32) for piece in pieces]
+    loudness = [speech_rms(piece, rate) for piece in pieces]
+    reference = range(len(pieces)) if reference is None else reference
+    target = np.median([loudness[i] for i in reference if loudness[i] > 0] or [0.0])
+    if target > 0:
+        for i, piece in enumerate(pieces):
+            if loudness[i] > 0:
+                piece *= np.clip(target / loudness[i], 1.0 / max_gain, max_gain)
+
+    overlap = int(rate * crossfade)
+    fade_in = 0.5 - 0.5 * np.cos(np.linspace(0.0, np.pi, overlap, dtype=np.float32))
+    output = pieces[0] if pieces else np.zeros(0, dtype=np.float32)
+    for piece in pieces[1:]:
+        n = min(overlap, output.size, piece.size)
+        if n == 0:
+            output = np.concatenate([output, piece])
+            continue
+        ramp = fade_in[:n] if n == overlap else 0.5 - 0.5 * np.cos(np.linspace(0.0, np.pi, n, dtype=np.float32))
+        blended = output[-n:] * (1.0 - ramp) + piece[:n] * ramp
+        output = np.concatenate([output[:-n], blended, piece[n:]])
+    return np.clip(output, -32768, 32767).astype(np.int16)
@@ -0,0 +1,54 @@
+"""
+Phrase pre-synthesis module for the Optimus Prime Voice Assistant
+"""
+import threading
+import time
+from text_to_speech import split_sentences
+from tts_worker import preload_tts, request_speech, PRIORITY_BACKGROUND
+
+
+class PhraseWarmer:
+    """
+    Synthesizes the fixed phrase library into the speech cache from a
+    background thread while the rest of the assistant starts, so common
+    acknowledgements never wait on the model. Its jobs are queued at
+    background priority, so every live reply is synthesized first.
+    Whole replies are cached in the sentence chunks the scheduler speaks
+    them in; template fragments are cached as they are spliced.
+    """
+
+    def __init__(self, phrases, audio_handler=None, fragments=()):
+        chunks = [chunk for phrase in phrases for chunk in split_sentences(phrase)]
+        # Keep order (the first phrases are needed first) but drop duplicates
+        self.phrases = list(dict.fromkeys(chunks + list(fragments)))
+        self.audio_handler = audio_handler
+        self.done = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="phrase-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        try:
+            start_time = time.time()
+            preload_tts()  # Load the model while Electron starts
+            for phrase in self.phrases:
+                if self._stop.is_set():
+                    return
+                # Stay out of the way while the assistant is talking
+                while self.audio_handler is not None and self.audio_handler.is_audio_playing.is_set():
+                    if self._stop.wait(0.1):
+                        return
+                # Already cached phrases come straight back from the speech cache
+                request_speech(phrase, priority=PRIORITY_BACKGROUND)
+            print(f"✅ Phrase library ready: {len(self.phrases)} phrases "
+                  f"in {time.time() - start_time:.1f}s")
+        except Exception as e:
+            print(f"⚠️ Phrase pre-synthesis failed: {e}")
+        finally:
+            self.done.set()
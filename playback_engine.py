@@ -0,0 +1,146 @@
+"""
+Playback engine module for the Optimus Prime Voice Assistant
+"""
+import collections
+import threading
+import numpy as np
+
+
+class PlaybackItem:
+    """One clip in the playback queue; wait() blocks until it was played or dropped"""
+
+    def __init__(self, samples, rate, on_start=None, on_done=None):
+        self.samples = samples
+        self.rate = rate
+        self.on_start = on_start
+        self.on_done = on_done
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.completed = False
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def wait(self, timeout=None):
+        """True if the clip was played to the end"""
+        self.done.wait(timeout)
+        return self.completed
+
+
+class PlaybackEngine:
+    """
+    Long-lived playback thread in front of an output sink.
+    Clips queued with enqueue() are played in order straight from memory.
+    The sink's stream stays open while more clips are waiting, so back-to-back
+    clips follow each other without a gap; it is only drained once the
+    queue runs dry. cancel() cuts off the clip that is playing and drops the
+    rest, flush() waits for everything queued to play out. on_idle() is
+    called each time the queue has played out and the sink is drained.
+    """
+
+    def __init__(self, sink, on_idle=None):
+        self.sink = sink
+        self.on_idle = on_idle
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._current = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="playback-engine", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, samples, rate, on_start=None, on_done=None):
+        """Queue 16-bit mono PCM for playback and return its PlaybackItem"""
+        item = PlaybackItem(np.ascontiguousarray(samples, dtype=np.int16), rate, on_start, on_done)
+        with self._condition:
+            if not self._closed:
+                self._queue.append(item)
+                self._condition.notify_all()
+                return item
+        self._finish(item, False)
+        return item
+
+    def cancel(self):
+        """Stop the clip that is playing and drop everything queued behind it"""
+        with self._condition:
+            dropped = list(self._queue)
+            self._queue.clear()
+            current = self._current
+        for item in dropped:
+            item.cancel()
+            self._finish(item, False)
+        if current is not None:
+            current.cancel()
+            self.sink.stop()
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has played; False on timeout"""
+        with self._condition:
+            pending = list(self._queue)
+            if self._current is not None:
+                pending.insert(0, self._current)
+        for item in pending:
+            if not item.done.wait(timeout):
+                return False
+        return True
+
+    def is_idle(self):
+        with self._condition:
+            return self._current is None and not self._queue
+
+    def close(self):
+        """Drop pending clips, stop the thread and release the sink"""
+        self.cancel()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=2)
+        self.sink.close()
+
+    def _next_item(self):
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return None
+            self._current = self._queue.popleft()
+            return self._current
+
+    def _finish(self, item, completed):
+        item.completed = completed
+        try:
+            if item.on_done:
+                item.on_done(completed)
+        except Exception as e:
+            print(f"⚠️ Playback callback failed: {e}")
+        finally:
+            item.done.set()
+
+    def _run(self):
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+
+            def started(item=item):
+                # A cancel between dequeuing and the first write must still cut the clip
+                if item.cancelled.is_set():
+                    self.sink.stop()
+                elif item.on_start:
+                    item.on_start()
+
+            completed = False
+            try:
+                if not item.cancelled.is_set():
+                    completed = self.sink.write(item.samples, item.rate, on_start=started)
+                with self._condition:
+                    drain = not self._queue
+                if drain:
+                    self.sink.drain()
+                    if self.on_idle:
+                        self.on_idle()
+            except Exception as e:
+                print(f"❌ Audio playback failed: {e}")
+            finally:
+                with self._condition:
+                    self._current = None
+                self._finish(item, completed and not item.cancelled.is_set())
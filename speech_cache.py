@@ -0,0 +1,136 @@
+"""
+Synthesized speech cache module for the Optimus Prime Voice Assistant
+"""
+import hashlib
+import os
+import threading
+import wave
+from collections import OrderedDict
+import numpy as np
+from audio_output import write_wav_atomic
+from audio_effects import apply_effects, variant_tag
+
+
+class SpeechCache:
+    """
+    Content-addressed cache of synthesized speech.
+    Entries are keyed by text, voice, language and model version and hold
+    16-bit PCM. An in-memory LRU sits in front of WAV files on disk; each
+    tier has its own size cap and evicts the least recently used clips.
+    """
+
+    def __init__(self, cache_dir, memory_limit=64 * 1024 * 1024, disk_limit=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory = OrderedDict()  # key -> (samples, sample_rate)
+        self._memory_bytes = 0
+        self._disk = OrderedDict()    # key -> file size, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._scan_disk()
+
+    @staticmethod
+    def make_key(text, voice, language, model_version):
+        """Content address for one synthesized clip"""
+        payload = "\0".join([text.strip(), voice, language, model_version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _scan_disk(self):
+        """Index existing cache files, oldest access first"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".wav"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _remember(self, key, samples, sample_rate):
+        """Add a clip to the memory tier, evicting old clips over the cap"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = (samples, sample_rate)
+        self._memory_bytes += samples.nbytes
+        while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+            _, (old_samples, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= old_samples.nbytes
+
+    def get(self, key):
+        """Return (samples, sample_rate) for a cached clip, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if key in self._disk:
+                path = self._path(key)
+                try:
+                    with wave.open(path, "rb") as wav:
+                        sample_rate = wav.getframerate()
+                        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+                    os.utime(path)  # Disk recency survives restarts through the mtime
+                    self._disk.move_to_end(key)
+                    self._remember(key, samples, sample_rate)
+                    self.hits += 1
+                    return samples, sample_rate
+                except Exception as e:
+                    print(f"⚠️ Dropping unreadable speech cache entry {path}: {e}")
+                    self._disk_bytes -= self._disk.pop(key)
+
+            self.misses += 1
+            return None
+
+    def get_variant(self, key, speed=1.0, volume=None):
+        """
+        Return (samples, sample_rate) of a cached clip at another speed or
+        volume, or None. Variants are computed once from the base clip and
+        cached next to it under a suffixed key.
+        """
+        tag = variant_tag(speed, volume)
+        if not tag:
+            return self.get(key)
+        variant = self.get(key + tag)
+        if variant is not None:
+            return variant
+        base = self.get(key)
+        if base is None:
+            return None
+        samples, sample_rate = apply_effects(base[0], base[1], speed, volume)
+        self.put(key + tag, samples, sample_rate)
+        return samples, sample_rate
+
+    def put(self, key, samples, sample_rate):
+        """Store a 16-bit PCM clip in both tiers"""
+        samples = np.ascontiguousarray(samples, dtype=np.int16)
+        with self._lock:
+            self._remember(key, samples, sample_rate)
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Renamed into place, so a reader in another process never sees half a clip
+                size = write_wav_atomic(self._path(key), samples, sample_rate)
+                self._disk_bytes += size - self._disk.pop(key, 0)
+                self._disk[key] = size
+                self._evict_disk()
+            except Exception as e:
+                print(f"⚠️ Could not write speech cache: {e}")
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.disk_limit and len(self._disk) > 1:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
@@ -0,0 +1,232 @@
+"""
+Speech scheduling module for the Optimus Prime Voice Assistant
+"""
+import heapq
+import itertools
+import threading
+import time
+from text_to_speech import split_sentences, SPEAKER_WAV
+from phrase_splicer import splice
+from tts_worker import submit_speech, PRIORITY_ERROR, PRIORITY_ACK, PRIORITY_CONTENT
+from tts_tiers import ACK_LATENCY_BUDGET, TIER_FAST
+
+
+class SpeechRequest:
+    """
+    One reply waiting to be spoken. Its sentences are queued for synthesis
+    as soon as the request is made; wait() blocks until it was played.
+    """
+
+    def __init__(self, seq, text, priority, speed, volume, electron_controller, turn):
+        self.seq = seq
+        self.text = text
+        self.priority = priority
+        self.speed = speed
+        self.volume = volume
+        self.electron_controller = electron_controller
+        self.turn = turn
+        self.jobs = []
+        # Sentences submitted once the first one has picked the reply's tier
+        self.pending_chunks = []
+        # Indices of the fixed template parts when the jobs are spliced into one clip
+        self.splice_reference = None
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.completed = False
+
+    def cancel(self):
+        self.cancelled.set()
+        for job in self.jobs:
+            job.cancel()
+
+    def wait(self, timeout=None):
+        """
+        True if the reply was played to the end; False if it was cut off or
+        playback failed (`cancelled` tells the two apart)
+        """
+        self.done.wait(timeout)
+        return self.completed
+
+
+class SpeechScheduler:
+    """
+    Single owner of the speaker. Every reply goes through say(): requests
+    are played one at a time, most urgent first (errors, acknowledgements,
+    then content), identical queued requests are coalesced, and starting a
+    new turn drops what is left over from the previous one.
+    """
+
+    def __init__(self, audio_handler, speaker_wav=SPEAKER_WAV):
+        self.audio_handler = audio_handler
+        self.speaker_wav = speaker_wav
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._current = None
+        self._turn = 0
+        self._thread = threading.Thread(target=self._run, name="speech-scheduler", daemon=True)
+        self._thread.start()
+
+    def say(self, text, priority=PRIORITY_CONTENT, speed=1.0, electron_controller=None, parts=None, volume=None):
+        """
+        Queue `text` for speaking and return its SpeechRequest.
+        With `parts` - (text, is_fixed) pairs from split_template - each part
+        is synthesized (or fetched from the cache) separately and spliced.
+        Speed and volume are applied during synthesis, so their variants of
+        cached sentences are cached as well.
+        """
+        with self._condition:
+            for _, _, queued in self._queue:
+                if (queued.text == text and queued.speed == speed and queued.volume == volume
+                        and not queued.cancelled.is_set()):
+                    if priority < queued.priority:
+                        queued.priority = priority
+                        self._reorder()
+                    return queued
+
+            request = SpeechRequest(next(self._counter), text, priority, speed, volume,
+                                    electron_controller, self._turn)
+            if parts:
+                request.jobs = [submit_speech(part, self.speaker_wav, priority=priority, speed=speed, volume=volume)
+                                for part, _ in parts]
+                request.splice_reference = [i for i, (_, fixed) in enumerate(parts) if fixed]
+            else:
+                chunks = split_sentences(text)
+                if priority <= PRIORITY_ACK:
+                    # Errors and acknowledgements must be heard quickly; under load
+                    # the first sentence may be voiced by the fast tier instead of
+                    # the model, and the rest of the reply follows it in _play
+                    request.jobs = [submit_speech(chunks[0], self.speaker_wav, priority=priority,
+                                                  budget=ACK_LATENCY_BUDGET, speed=speed, volume=volume)]
+                    request.pending_chunks = chunks[1:]
+                else:
+                    request.jobs = [submit_speech(chunk, self.speaker_wav, priority=priority,
+                                                  speed=speed, volume=volume)
+                                    for chunk in chunks]
+            heapq.heappush(self._queue, (priority, request.seq, request))
+            self._condition.notify_all()
+            return request
+
+    def new_turn(self):
+        """
+        A new command is being handled: anything still waiting from earlier
+        turns is stale and dropped, except error reports
+        """
+        with self._condition:
+            self._turn += 1
+            stale = [entry for entry in self._queue if entry[2].priority > PRIORITY_ERROR]
+            for _, _, request in stale:
+                request.cancel()
+            self._queue = [entry for entry in self._queue if entry not in stale]
+            heapq.heapify(self._queue)
+            current = self._current
+        if current is not None and current.turn < self._turn and current.priority > PRIORITY_ERROR:
+            current.cancel()
+            self.audio_handler.stop_playback()
+
+    def cancel_all(self):
+        """Drop everything queued and cut off the reply that is playing"""
+        with self._condition:
+            requests = [request for _, _, request in self._queue]
+            self._queue.clear()
+            if self._current is not None:
+                requests.append(self._current)
+        for request in requests:
+            request.cancel()
+        self.audio_handler.stop_playback()
+
+    def _reorder(self):
+        self._queue = [(request.priority, seq, request) for _, seq, request in self._queue]
+        heapq.heapify(self._queue)
+
+    def _next_request(self):
+        with self._condition:
+            while True:
+                while self._queue:
+                    _, _, request = heapq.heappop(self._queue)
+                    if not request.cancelled.is_set():
+                        self._current = request
+                        return request
+                    request.done.set()
+                self._condition.wait()
+
+    def _run(self):
+        while True:
+            request = self._next_request()
+            try:
+                request.completed = self._play(request)
+                if not request.completed and not request.cancelled.is_set():
+                    print(f"❌ Reply was not played to the end: {request.text[:40]}")
+            except Exception as e:
+                print(f"❌ Speech playback failed: {e}")
+            finally:
+                with self._condition:
+                    self._current = None
+                request.done.set()
+
+    def _play(self, request):
+        """Play a request's sentences in order as their synthesis finishes"""
+        controller = request.electron_controller
+        if controller:
+            controller.play_animation()
+        start_time = time.time()
+        # Keep the playing flag up across sentence boundaries so the listen
+        # loop and background work treat the reply as one utterance
+        was_playing = self.audio_handler.is_audio_playing.is_set()
+        try:
+            if request.splice_reference is not None:
+                return self._play_spliced(request)
+            items = []
+            for index, job in enumerate(request.jobs):
+                speech = job.result()
+                if speech is None or request.cancelled.is_set():
+                    return False
+                if index == 0:
+                    self._submit_pending(request, fast=job.tier == TIER_FAST)
+                    self.audio_handler.is_audio_playing.set()
+                    if len(request.jobs) > 1:
+                        print(f"⏱️ First audio after {time.time() - start_time:.2f}s ({len(request.jobs)} chunks)")
+                # Queued while the previous sentence is still playing, so they join without a gap
+                items.append(self.audio_handler.queue_samples(*speech))
+            completed = [item.wait() for item in items]
+            return all(completed)
+        finally:
+            if not was_playing:
+                self.audio_handler.is_audio_playing.clear()
+            if controller:
+                controller.pause_animation()
+
+    def _submit_pending(self, request, fast):
+        """Submit the rest of a reply on the tier its first sentence was voiced with"""
+        chunks, request.pending_chunks = request.pending_chunks, []
+        jobs = [submit_speech(chunk, self.speaker_wav, priority=request.priority, speed=request.speed,
+                              volume=request.volume, fast=fast)
+                for chunk in chunks]
+        request.jobs.extend(jobs)
+        if request.cancelled.is_set():
+            for job in jobs:
+                job.cancel()
+
+    def _play_spliced(self, request):
+        """
+        Join a template's fixed parts and slot audio and play it. Where one
+        slot sentence follows another, the clip so far is queued right away,
+        so a long slot starts playing after its first sentence.
+        """
+        fixed = set(request.splice_reference)
+        items = []
+        pieces, reference = [], []
+        for index, job in enumerate(request.jobs):
+            speech = job.result()
+            if speech is None or request.cancelled.is_set():
+                return False
+            samples, sample_rate = speech
+            if index in fixed:
+                reference.append(len(pieces))
+            pieces.append(samples)
+            if index == len(request.jobs) - 1 or (index not in fixed and index + 1 not in fixed):
+                clip = splice(pieces, sample_rate, reference=reference or None)
+                self.audio_handler.is_audio_playing.set()
+                items.append(self.audio_handler.queue_samples(clip, sample_rate))
+                pieces, reference = [], []
+        return all([item.wait() for item in items])
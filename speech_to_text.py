@@ -1,84 +1,645 @@
 import speech_recognition as sr
 import pyaudio
+import json
+import os
 import time
 import threading
+from microphone_stream import MicrophoneStream, AudioFrameBuffer
+from audio_preprocessing import AudioPreprocessor, NoiseFloorTracker
+from wake_word import WakeWordDetector
+from voice_activity import VoiceActivityDetector, VAD_WAITING, VAD_SPEAKING, VAD_TIMEOUT
+
+class MicrophoneState:
+    """
+    Microphone state shared by every capture backend and by the code that
+    mutes the assistant (music playback, barge-in).
+    Muting gates the consumers; the capture device itself keeps running.
+    """
+
+    def __init__(self):
+        self.active = threading.Event()
+        self.active.set()  # Start with microphone active
+        self.capture = None  # Name of the capture backend in use
+        self.playback_ended = None  # perf_counter time the assistant last stopped talking
+
+    def is_active(self):
+        return self.active.is_set()
+
+    def activate(self):
+        self.active.set()
+
+    def deactivate(self):
+        self.active.clear()
+
+    def mark_playback_end(self):
+        """Record that the speaker has gone quiet, so the listen pre-roll skips its echo"""
+        self.playback_ended = time.perf_counter()
+
 
 # Global variable to control microphone state
-microphone_active = threading.Event()
-microphone_active.set()  # Start with microphone active
+microphone_state = MicrophoneState()
+microphone_active = microphone_state.active
 
 
 # Global recognizer instance for better performance
 _recognizer = None
-_pyaudio = None
+_recognizer_tuning = None
+_sr_microphone = None
+_profiles = {}
+_profiles_mtime = None
+_active_profile = None
+_microphone_stream = None
+_microphone_lock = threading.Lock()
+_frame_buffer = None
+_noise_floor = None
+_backends = {}
+_backend_lock = threading.RLock()
+_capture_backends = {}
+_wake_word_detector = None
+_wake_word_checked = False
 
 # Audio parameters
 RATE = 16000
 CHUNK = 1024
 CHANNELS = 1
 FORMAT = pyaudio.paInt16
+SAMPLE_WIDTH = 2
+
+# Endpointing parameters (seconds)
+VAD_SPEECH_START = 0.2       # Voiced audio needed before an utterance opens
+VAD_TRAILING_SILENCE = 0.8   # Silence that closes an utterance
+VAD_MAX_WAIT = 10            # Listen window with no speech before giving up
+VAD_MAX_UTTERANCE = 10       # Hard cap on a single command
+VAD_PRE_ROLL = 0.3           # Audio kept from before the speech start
+VAD_MIN_ENERGY = 400         # Floor for the adaptive speech threshold (RMS)
+VAD_SNR_RATIO = 3.0          # Speech must be this far above the noise floor
+
+# High-pass filter and automatic gain control on captured audio
+PREPROCESS_AUDIO = os.environ.get("OPTIMUS_AUDIO_PREPROCESS", "1") == "1"
+
+# Persistent capture parameters (seconds)
+STREAM_BUFFER_SECONDS = 10   # Size of the capture ring buffer
+LISTEN_PRE_ROLL = 0.4        # Audio taken from before listen_for_command was called
+PLAYBACK_TAIL = 0.1          # Room echo after playback ends, never part of the pre-roll
+
+# Recognizer backend selection - "google", "vosk" or "whisper"
+STT_BACKEND = os.environ.get("OPTIMUS_STT_BACKEND", "google")
+VOSK_MODEL_PATH = os.environ.get("OPTIMUS_VOSK_MODEL", "models/vosk-model-small-en-us-0.15")
+WHISPER_MODEL = os.environ.get("OPTIMUS_WHISPER_MODEL", "base.en")
+
+# Wake word gate - full recognition only runs on audio following the wake word
+WAKE_WORD = os.environ.get("OPTIMUS_WAKE_WORD", "optimus")
+WAKE_WORD_GATE = os.environ.get("OPTIMUS_WAKE_WORD_GATE", "1") == "1"
+WAKE_WORD_ENERGY_THRESHOLD = 800
+
+# Tuning profiles - named in stt_profiles.json and picked with OPTIMUS_STT_PROFILE.
+# The file is re-read when it changes, so profiles can be switched at runtime.
+STT_PROFILES_PATH = os.environ.get(
+    "OPTIMUS_STT_PROFILES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "stt_profiles.json")
+)
+STT_PROFILE = os.environ.get("OPTIMUS_STT_PROFILE", "default")
+DEFAULT_PROFILE = {
+    "capture": "raw",                      # "raw" (persistent PyAudio stream) or "sr_microphone"
+    "recognizer": STT_BACKEND,             # Any key of RECOGNIZER_BACKENDS
+    "energy_threshold": 2500,
+    "dynamic_energy_threshold": True,
+    "pause_threshold": VAD_TRAILING_SILENCE,
+    "phrase_threshold": 0.3,
+    "speech_start": VAD_SPEECH_START,
+    "max_wait": VAD_MAX_WAIT,
+    "max_utterance": VAD_MAX_UTTERANCE,
+    "wake_word": WAKE_WORD_GATE,
+    "preprocess": PREPROCESS_AUDIO,
+}
+
+
+class RecognitionStream:
+    """
+    Incremental recognition session for one utterance.
+    The base session recognizes the whole utterance once at endpoint, reading
+    it from the caller's AudioFrameBuffer when one is given; engines that can
+    decode incrementally override accept() to return partials.
+    """
+
+    def __init__(self, backend, sample_rate, sample_width=2, buffer=None):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.buffer = buffer
+        self._audio = bytearray() if buffer is None else None
+
+    def accept(self, data):
+        """Feed one chunk; returns the current partial hypothesis or None"""
+        if self._audio is not None:
+            self._audio += data
+        return None
+
+    def finish(self):
+        """Return the final transcript for the utterance"""
+        audio = self.buffer.getbuffer() if self.buffer is not None else self._audio
+        return self.backend.recognize(audio, self.sample_rate, self.sample_width)
+
+
+class RecognizerBackend:
+    """
+    Base class for speech recognition engines.
+    load() is called once; recognize() takes raw 16-bit mono PCM and returns
+    the transcript, or None when nothing intelligible was said.
+    """
+    name = None
+
+    def load(self):
+        """Load the engine and keep it warm for later calls"""
+        pass
+
+    def recognize(self, frame_data, sample_rate, sample_width=2):
+        raise NotImplementedError
+
+    def start_stream(self, sample_rate, sample_width=2, buffer=None):
+        """Open an incremental recognition session for one utterance"""
+        return RecognitionStream(self, sample_rate, sample_width, buffer)
+
+
+class GoogleRecognizerBackend(RecognizerBackend):
+    """Google Web Speech API - needs a network round trip per utterance"""
+    name = "google"
+
+    def recognize(self, frame_data, sample_rate, sample_width=2):
+        audio_data = sr.AudioData(frame_data, sample_rate, sample_width)
+        try:
+            return get_recognizer().recognize_google(
+                audio_data,
+                language="en-US",
+                show_all=False
+            )
+        except sr.UnknownValueError:
+            return None
+
+
+class VoskRecognitionStream(RecognitionStream):
+    """Vosk decodes as audio arrives, so partial hypotheses come for free"""
+
+    def __init__(self, backend, sample_rate, sample_width=2, buffer=None):
+        super().__init__(backend, sample_rate, sample_width, buffer)
+        from vosk import KaldiRecognizer
+        self._recognizer = KaldiRecognizer(backend.model, sample_rate)
+        self._segments = []
+
+    def accept(self, data):
+        if self._recognizer.AcceptWaveform(bytes(data)):
+            segment = json.loads(self._recognizer.Result()).get("text", "")
+            if segment:
+                self._segments.append(segment)
+            partial = ""
+        else:
+            partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._segments + [partial]).strip() or None
+
+    def finish(self):
+        segment = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if segment:
+            self._segments.append(segment)
+        return " ".join(self._segments).strip() or None
+
+
+class VoskRecognizerBackend(RecognizerBackend):
+    """Offline Kaldi-based recognition on the CPU using a local Vosk model"""
+    name = "vosk"
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or VOSK_MODEL_PATH
+        self.model = None
+
+    def load(self):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Vosk model not found at '{self.model_path}'")
+        print(f"🤖 Loading Vosk model from {self.model_path}...")
+        self.model = Model(self.model_path)
+
+    def recognize(self, frame_data, sample_rate, sample_width=2):
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(bytes(frame_data))
+        text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        return text or None
+
+    def start_stream(self, sample_rate, sample_width=2, buffer=None):
+        return VoskRecognitionStream(self, sample_rate, sample_width, buffer)
+
+
+class WhisperRecognizerBackend(RecognizerBackend):
+    """Offline whisper.cpp recognition on the CPU through pywhispercpp"""
+    name = "whisper"
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name or WHISPER_MODEL
+        self.model = None
+
+    def load(self):
+        from pywhispercpp.model import Model
+        print(f"🤖 Loading whisper.cpp model {self.model_name}...")
+        self.model = Model(self.model_name, print_progress=False, print_realtime=False)
+
+    def recognize(self, frame_data, sample_rate, sample_width=2):
+        import numpy as np
+        if sample_rate != 16000:
+            raise ValueError("whisper.cpp expects 16 kHz audio")
+        samples = np.frombuffer(frame_data, dtype=np.int16).astype(np.float32) / 32768.0
+        segments = self.model.transcribe(samples)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return text or None
+
+
+RECOGNIZER_BACKENDS = {
+    GoogleRecognizerBackend.name: GoogleRecognizerBackend,
+    VoskRecognizerBackend.name: VoskRecognizerBackend,
+    WhisperRecognizerBackend.name: WhisperRecognizerBackend,
+}
+
+def load_profiles():
+    """Read the tuning profiles file, re-reading it only when it has changed"""
+    global _profiles, _profiles_mtime
+    try:
+        mtime = os.path.getmtime(STT_PROFILES_PATH)
+    except OSError:
+        return _profiles
+    if mtime != _profiles_mtime:
+        try:
+            with open(STT_PROFILES_PATH, "r") as f:
+                _profiles = json.load(f)
+            _profiles_mtime = mtime
+        except Exception as e:
+            print(f"⚠️ Could not read speech profiles: {e}")
+    return _profiles
+
+def set_active_profile(profile):
+    """
+    Override the profile chosen by OPTIMUS_STT_PROFILE with a profile name,
+    a dict of settings, or None to go back to the environment's choice
+    """
+    global _active_profile
+    _active_profile = profile
 
-def get_recognizer():
+def get_profile():
+    """Current tuning profile, merged over the defaults"""
+    profile = _active_profile if _active_profile is not None else STT_PROFILE
+    settings = dict(DEFAULT_PROFILE)
+    if isinstance(profile, dict):
+        settings.update(profile)
+        settings.setdefault("name", "custom")
+        return settings
+    profiles = load_profiles()
+    if profile not in profiles and profile != "default":
+        print(f"⚠️ Unknown speech profile '{profile}', using defaults")
+    settings.update(profiles.get(profile, {}))
+    settings["name"] = profile
+    return settings
+
+def get_recognizer(profile=None):
     """Get or create recognizer instance for better performance"""
-    global _recognizer, _pyaudio
+    global _recognizer, _recognizer_tuning
     if _recognizer is None:
         _recognizer = sr.Recognizer()
-        _recognizer.dynamic_energy_threshold = True
-        _recognizer.energy_threshold = 2500
-        _recognizer.pause_threshold = 4
         _recognizer.operation_timeout = 2
-        _recognizer.phrase_threshold = 0.3
+    # Re-apply tuning only when the profile changes so the dynamic energy
+    # threshold keeps what it has learned
+    profile = profile or get_profile()
+    tuning = (
+        profile["energy_threshold"], profile["dynamic_energy_threshold"],
+        profile["pause_threshold"], profile["phrase_threshold"]
+    )
+    if tuning != _recognizer_tuning:
+        _recognizer_tuning = tuning
+        _recognizer.energy_threshold, _recognizer.dynamic_energy_threshold, \
+            _recognizer.pause_threshold, _recognizer.phrase_threshold = tuning
+    return _recognizer
+
+def _create_microphone_stream(source=None):
+    return MicrophoneStream(
+        RATE, CHUNK, CHANNELS, FORMAT, SAMPLE_WIDTH,
+        buffer_seconds=STREAM_BUFFER_SECONDS,
+        source=source,
+        preprocessor=AudioPreprocessor(RATE) if get_profile()["preprocess"] else None
+    )
 
-        _pyaudio = pyaudio.PyAudio()
-    return _recognizer, _pyaudio
+def _playback_tail_end():
+    """perf_counter time from which the microphone no longer hears the assistant"""
+    ended = microphone_state.playback_ended
+    return None if ended is None else ended + PLAYBACK_TAIL
 
-def listen_for_command():
+def get_microphone_stream():
+    """Get the shared microphone stream, opening the device on first use"""
+    global _microphone_stream
+    if _microphone_stream is None:
+        with _microphone_lock:
+            if _microphone_stream is None:
+                _microphone_stream = _create_microphone_stream()
+    _microphone_stream.start()
+    return _microphone_stream
+
+def set_audio_source(source):
     """
-    Optimized voice command listener with raw PyAudio input
+    Capture from `source` instead of the microphone, e.g. a WAV replay source
+    for benchmarks on machines without a microphone
     """
-    if not microphone_active.is_set():
-        time.sleep(0.1) # 
+    global _microphone_stream
+    with _microphone_lock:
+        if _microphone_stream is not None:
+            _microphone_stream.stop()
+        _microphone_stream = _create_microphone_stream(source)
+
+def get_recognizer_backend(name=None):
+    """
+    Get the loaded recognizer backend selected by name or the active profile.
+    Each backend is loaded once and reused; an offline engine that cannot be
+    loaded falls back to Google.
+    """
+    name = (name or get_profile()["recognizer"]).lower()
+    if name not in _backends:
+        with _backend_lock:
+            if name not in _backends:
+                backend_class = RECOGNIZER_BACKENDS.get(name)
+                if backend_class is None:
+                    print(f"⚠️ Unknown speech backend '{name}', using Google")
+                    backend_class = GoogleRecognizerBackend
+                backend = backend_class()
+                try:
+                    backend.load()
+                except Exception as e:
+                    if name == GoogleRecognizerBackend.name:
+                        raise
+                    print(f"⚠️ Could not load '{name}' speech backend ({e}), using Google")
+                    backend = GoogleRecognizerBackend()
+                    backend.load()
+                _backends[name] = backend
+    return _backends[name]
+
+def get_wake_word_detector():
+    """
+    Get the wake word detector, or None when the active profile disables the
+    gate or no keyword spotting model is available
+    """
+    global _wake_word_detector, _wake_word_checked
+    if not get_profile()["wake_word"]:
         return None
+    with _backend_lock:
+        if not _wake_word_checked:
+            _wake_word_checked = True
+            try:
+                # Share the model with the Vosk recognizer backend when it is loaded
+                vosk_backend = _backends.get(VoskRecognizerBackend.name)
+                if isinstance(vosk_backend, VoskRecognizerBackend):
+                    model = vosk_backend.model
+                else:
+                    from vosk import Model, SetLogLevel
+                    SetLogLevel(-1)
+                    if not os.path.exists(VOSK_MODEL_PATH):
+                        raise FileNotFoundError(f"Vosk model not found at '{VOSK_MODEL_PATH}'")
+                    model = Model(VOSK_MODEL_PATH)
+                _wake_word_detector = WakeWordDetector(
+                    model, RATE,
+                    keyword=WAKE_WORD,
+                    energy_threshold=WAKE_WORD_ENERGY_THRESHOLD,
+                    chunk=CHUNK
+                )
+                print(f"👂 Wake word gate enabled - say '{WAKE_WORD}' before a command")
+            except Exception as e:
+                print(f"⚠️ Wake word gate unavailable ({e}), listening to every utterance")
+                _wake_word_detector = None
+    return _wake_word_detector
 
-    recognizer, pa = get_recognizer()
+def wait_for_wake_word(mic, seq, detector, max_wait=VAD_MAX_WAIT):
+    """
+    Run keyword spotting on the capture stream.
+    Returns the stream position right after the wake word, or None if it was
+    not heard within the listen window.
+    """
+    detector.reset()
+    chunk = memoryview(bytearray(mic.chunk_bytes))
+    deadline = time.time() + max_wait
+    while time.time() < deadline:
+        if not microphone_state.is_active():
+            return None
+        seq, nbytes = mic.readinto(seq, chunk)
+        if nbytes == 0:
+            continue
+        if detector.process(chunk[:nbytes]):
+            print("👂 Wake word detected")
+            return seq
+    return None
 
-    try:
-        # Open raw audio stream
-        stream = pa.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            frames_per_buffer=CHUNK
+def get_noise_floor():
+    """
+    Get the noise floor tracker used by the endpointer.
+    It lives across listen calls so the threshold keeps adapting to the room;
+    it starts out at the recognizer's energy_threshold.
+    """
+    global _noise_floor
+    if _noise_floor is None:
+        _noise_floor = NoiseFloorTracker(
+            initial_floor=get_recognizer().energy_threshold / VAD_SNR_RATIO,
+            min_threshold=VAD_MIN_ENERGY,
+            snr_ratio=VAD_SNR_RATIO
         )
+    return _noise_floor
+
+def get_frame_buffer(max_utterance=VAD_MAX_UTTERANCE, speech_start=VAD_SPEECH_START):
+    """Get the preallocated utterance buffer, sized for the longest command plus pre-roll"""
+    global _frame_buffer
+    seconds = max_utterance + speech_start + VAD_PRE_ROLL
+    size = int(RATE * seconds) * SAMPLE_WIDTH * CHANNELS + 2 * CHUNK * SAMPLE_WIDTH * CHANNELS
+    if _frame_buffer is None or _frame_buffer.capacity < size:
+        _frame_buffer = AudioFrameBuffer(size)
+    return _frame_buffer
+
+def close_microphone_stream():
+    """Release the input device"""
+    if _microphone_stream is not None:
+        _microphone_stream.stop()
+
+
+class CaptureBackend:
+    """
+    Base class for the ways of capturing a command.
+    stream() yields (text, False) partial hypotheses and (text, True) once
+    with the final transcript; nothing for silent windows.
+    """
+    name = None
+
+    def stream(self, profile, recognizer_backend, start_seq=None):
+        raise NotImplementedError
+
+
+class RawCaptureBackend(CaptureBackend):
+    """
+    Persistent PyAudio stream with preprocessing, wake word gate and the
+    streaming VAD endpointer
+    """
+    name = "raw"
+
+    def stream(self, profile, recognizer_backend, start_seq=None):
+        recognizer = get_recognizer(profile)
+
+        # The device stays open between calls; start reading slightly in the
+        # past so words spoken while the previous command was handled survive
+        mic = get_microphone_stream()
+        seq = mic.cursor(pre_roll=LISTEN_PRE_ROLL, not_before=_playback_tail_end())
+        if start_seq is not None:
+            seq = max(start_seq, mic.buffer.oldest_seq())
+
+        # Only audio that follows the wake word reaches full recognition
+        detector = get_wake_word_detector()
+        if detector is not None:
+            seq = wait_for_wake_word(mic, seq, detector, profile["max_wait"])
+            if seq is None:
+                return
 
         print("🎙️ Listening (raw audio)...")
 
-        # Capture audio for up to 10 seconds but check microphone state periodically
-        frames = []
-        for _ in range(int(RATE / CHUNK * 10)):  #  10 seconds max
-            if not microphone_active.is_set():  # Check if microphone was deactivated during capture
-                stream.stop_stream()
-                stream.close()
-                return None
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            frames.append(data)
-
-        stream.stop_stream()
-        stream.close()
-
-        # Convert raw frames into AudioData for recognizer
-        audio_data = sr.AudioData(b"".join(frames), RATE, 2)
-
-        # Recognize speech using Google
-        text = recognizer.recognize_google(
-            audio_data,
-            language="en-US",
-            show_all=False
+        # Stream chunks through the endpointer: the utterance closes as soon as
+        # the trailing silence is reached instead of after a fixed window
+        vad = VoiceActivityDetector(
+            RATE, CHUNK,
+            energy_threshold=recognizer.energy_threshold,
+            speech_start=profile["speech_start"],
+            trailing_silence=recognizer.pause_threshold,
+            max_wait=profile["max_wait"],
+            max_utterance=profile["max_utterance"],
+            noise_floor=get_noise_floor()
+        )
+        pre_roll_chunks = vad.start_window_chunks() + int(RATE / CHUNK * VAD_PRE_ROLL)
+
+        # Chunks are read straight into preallocated memory: a scratch chunk while
+        # waiting for speech, then consecutive slots of the utterance buffer
+        scratch = memoryview(bytearray(mic.chunk_bytes))
+        frame_buffer = get_frame_buffer(profile["max_utterance"], profile["speech_start"])
+        frame_buffer.reset()
+        session = None
+        last_partial = None
+        while True:
+            if not microphone_state.is_active():  # Microphone gated off during capture
+                return
+            slot = scratch if session is None else frame_buffer.next_slot(mic.chunk_bytes)
+            if slot is None:
+                break  # Utterance buffer is full
+            next_seq, nbytes = mic.readinto(seq, slot)
+            if nbytes == 0:
+                continue
+            data = slot[:nbytes]
+            state = vad.process(data)
+            if state == VAD_WAITING:
+                seq = next_seq
+                continue
+            if state == VAD_TIMEOUT:
+                # Silent window - skip recognition entirely
+                return
+            if session is None:
+                # Speech just opened - the ring buffer still holds the pre-roll,
+                # so copy it and the current chunk into the utterance buffer
+                session = recognizer_backend.start_stream(RATE, SAMPLE_WIDTH, buffer=frame_buffer)
+                first_seq = max(mic.buffer.oldest_seq(), next_seq - 1 - pre_roll_chunks)
+                for pre_seq in range(first_seq, next_seq):
+                    pre_slot = frame_buffer.next_slot(mic.chunk_bytes)
+                    _, pre_bytes = mic.readinto(pre_seq, pre_slot, timeout=0)
+                    frame_buffer.commit(pre_bytes)
+                    partial = session.accept(pre_slot[:pre_bytes])
+            else:
+                frame_buffer.commit(nbytes)
+                partial = session.accept(data)
+            seq = next_seq
+            if partial and partial != last_partial:
+                last_partial = partial
+                yield partial.lower(), False
+            if state != VAD_SPEAKING:
+                break
+
+        endpoint_time = time.perf_counter()
+        text = session.finish()
+        if text:
+            print(f"✅ Recognized: {text} ({time.perf_counter() - endpoint_time:.2f}s after endpoint, profile '{profile['name']}')")
+            yield text.lower(), True
+
+
+class SpeechRecognitionCaptureBackend(CaptureBackend):
+    """
+    sr.Microphone capture using the recognizer's own listen() and its
+    pause_threshold endpointing. Opens the device for every command.
+    """
+    name = "sr_microphone"
+
+    def stream(self, profile, recognizer_backend, start_seq=None):
+        global _sr_microphone
+        recognizer = get_recognizer(profile)
+        if _sr_microphone is None:
+            _sr_microphone = sr.Microphone(sample_rate=RATE)
+
+        print("🎙️ Listening...")
+        try:
+            with _sr_microphone as source:
+                audio = recognizer.listen(source, timeout=1, phrase_time_limit=profile["max_utterance"])
+        except sr.WaitTimeoutError:
+            # Timeout occurred, no speech detected within timeout period
+            return
+
+        endpoint_time = time.perf_counter()
+        text = recognizer_backend.recognize(
+            audio.get_raw_data(convert_rate=RATE, convert_width=SAMPLE_WIDTH),
+            RATE, SAMPLE_WIDTH
         )
+        if text:
+            print(f"✅ Recognized: {text} ({time.perf_counter() - endpoint_time:.2f}s after endpoint, profile '{profile['name']}')")
+            yield text.lower(), True
 
-        print(f"✅ Recognized: {text}")
-        return text.lower()
+
+CAPTURE_BACKENDS = {
+    RawCaptureBackend.name: RawCaptureBackend,
+    SpeechRecognitionCaptureBackend.name: SpeechRecognitionCaptureBackend,
+}
+
+def get_capture_backend(name):
+    """Get the capture backend registered under `name`"""
+    if name not in _capture_backends:
+        backend_class = CAPTURE_BACKENDS.get(name)
+        if backend_class is None:
+            print(f"⚠️ Unknown capture backend '{name}', using raw audio")
+            backend_class = RawCaptureBackend
+        _capture_backends[name] = backend_class()
+    return _capture_backends[name]
+
+def stream_command(start_seq=None):
+    """
+    Incremental voice command recognition with the active tuning profile.
+    Yields (text, False) partial hypotheses while the user speaks and
+    (text, True) once with the final transcript at endpoint. Nothing is
+    yielded for silent windows. start_seq resumes reading from an earlier
+    stream position, e.g. where the user barged in.
+    """
+    if not microphone_state.is_active():
+        time.sleep(0.1) # 
+        return
+
+    profile = get_profile()
+    capture = get_capture_backend(profile["capture"])
+    microphone_state.capture = capture.name
+    recognizer_backend = get_recognizer_backend(profile["recognizer"])
+    yield from capture.stream(profile, recognizer_backend, start_seq)
+
+def listen_for_command(on_partial=None, start_seq=None):
+    """
+    Voice command listener using the capture and recognizer backends of the
+    active profile. on_partial, if given, is called with each partial
+    hypothesis before the final transcript is returned.
+    """
+    try:
+        for text, is_final in stream_command(start_seq):
+            if is_final:
+                return text
+            if on_partial:
+                on_partial(text)
+        return None
 
     except sr.UnknownValueError:
         # Return None if no speech was recognized
@@ -92,11 +653,14 @@ def listen_for_command():
 
 def main():
     """Test function for speech recognition"""
-    print("🎙️ Speech Recognition Test (Raw Audio)")
+    print(f"🎙️ Speech Recognition Test (profile '{get_profile()['name']}')")
     print("=" * 40)
-    print("Say something (you have 3 seconds)...")
+    print("Say something...")
 
-    command = listen_for_command()
+    try:
+        command = listen_for_command()
+    finally:
+        close_microphone_stream()
 
     if command:
         print(f"📝 You said: {command}")
@@ -104,4 +668,4 @@ def main():
         print("🔇 No command recognized")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,92 @@
+"""
+Startup profiling module for the Optimus Prime Voice Assistant
+"""
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _Node:
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self.children = []
+
+
+class StartupProfiler:
+    """
+    Records a timing tree of first-time imports and named initializer steps
+    on the main thread, from enable() until report(). Does nothing until
+    enabled, so the hooks can stay in place in normal runs.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._root = _Node("startup", "step")
+        self._stack = [self._root]
+        self._original_import = None
+        self._thread = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._thread = threading.get_ident()
+        self._root.start = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only time the first import of a module, on the main thread
+        if (level or name in sys.modules or threading.get_ident() != self._thread):
+            return self._original_import(name, globals, locals, fromlist, level)
+        with self._measure(name, "import"):
+            return self._original_import(name, globals, locals, fromlist, level)
+
+    @contextmanager
+    def _measure(self, name, kind):
+        node = _Node(name, kind)
+        self._stack[-1].children.append(node)
+        self._stack.append(node)
+        try:
+            yield node
+        finally:
+            node.elapsed = time.perf_counter() - node.start
+            self._stack.pop()
+
+    @contextmanager
+    def step(self, name):
+        """Time an initializer; imports it triggers are nested under it"""
+        if not self.enabled or threading.get_ident() != self._thread:
+            yield
+            return
+        with self._measure(name, "step"):
+            yield
+
+    def report(self, label="first listen", min_ms=1.0):
+        """Print the timing tree up to now and stop recording"""
+        if not self.enabled:
+            return
+        builtins.__import__ = self._original_import
+        self.enabled = False
+        self._root.elapsed = time.perf_counter() - self._root.start
+        print(f"⏱️ Startup profile: {self._root.elapsed * 1000:.0f} ms to {label}")
+        for child in self._root.children:
+            self._print(child, 1, min_ms)
+
+    def _print(self, node, depth, min_ms):
+        ms = node.elapsed * 1000
+        if ms < min_ms:
+            return
+        own = ms - sum(child.elapsed for child in node.children) * 1000
+        tag = "import " if node.kind == "import" else ""
+        print(f"{'  ' * depth}{ms:8.1f} ms  (self {own:7.1f})  {tag}{node.name}")
+        for child in node.children:
+            self._print(child, depth + 1, min_ms)
+
+
+startup_profiler = StartupProfiler()
@@ -3,9 +3,15 @@ System optimization module for the Optimus Prime Voice Assistant
 """
 import os
 import psutil
+from tts_inference import thread_settings
 
 
 class SystemOptimizer:
+    # Load above which the assistant should shed work
+    HIGH_CPU_PERCENT = 80
+    HIGH_MEMORY_PERCENT = 85
+    _process = None
+
     @staticmethod
     def optimize_system_performance():
         """Optimize system performance for M3 Pro MacBook"""
@@ -13,11 +19,14 @@ class SystemOptimizer:
             # Set process priority to high for better performance
             os.nice(-10)  # Higher priority
             
-            # Optimize for M3 Pro architecture
-            # Set environment variables for better performance
+            # Size the math libraries' thread pools from the detected cores.
+            # These variables only take effect in processes that import torch
+            # afterwards - the TTS worker; the model itself also calls
+            # torch.set_num_threads when it loads (see tts_inference)
             os.environ['PYTHONUNBUFFERED'] = '1'
-            os.environ['OMP_NUM_THREADS'] = '8'  # M3 Pro has 8 performance cores
-            os.environ['MKL_NUM_THREADS'] = '8'
+            threads, _ = thread_settings()
+            os.environ.setdefault('OMP_NUM_THREADS', str(threads))
+            os.environ.setdefault('MKL_NUM_THREADS', str(threads))
             
             # Configure psutil for better resource monitoring
             psutil.cpu_percent(interval=None)  # Initialize CPU monitoring
@@ -38,7 +47,7 @@ class SystemOptimizer:
             memory_percent = psutil.virtual_memory().percent
             
             # Adjust performance based on system load
-            if cpu_percent > 80 or memory_percent > 85:
+            if SystemOptimizer.is_high_load(cpu_percent, memory_percent):
                 print(f"⚠️ High system load - CPU: {cpu_percent}%, Memory: {memory_percent}%")
                 return False  # Reduce processing
             elif cpu_percent > 60 or memory_percent > 70:
@@ -47,4 +56,29 @@ class SystemOptimizer:
             else:
                 return True   # Full performance
         except:
-            return True  # Default to full performance if monitoring fails
\ No newline at end of file
+            return True  # Default to full performance if monitoring fails
+
+    @staticmethod
+    def is_high_load(cpu_percent, memory_percent):
+        return (cpu_percent > SystemOptimizer.HIGH_CPU_PERCENT
+                or memory_percent > SystemOptimizer.HIGH_MEMORY_PERCENT)
+
+    @staticmethod
+    def sample_load(exclude_self=False):
+        """
+        (cpu_percent, memory_percent) without blocking: CPU usage is measured
+        since the previous call instead of over a sampling interval.
+        exclude_self leaves this process's own CPU time out, so the TTS
+        worker does not read its own synthesis as system load.
+        """
+        try:
+            cpu = psutil.cpu_percent(interval=None)
+            if exclude_self:
+                if SystemOptimizer._process is None:
+                    SystemOptimizer._process = psutil.Process()
+                # Process CPU is per core, the system figure an average over all cores
+                own = SystemOptimizer._process.cpu_percent(interval=None) / (psutil.cpu_count() or 1)
+                cpu = max(0.0, cpu - own)
+            return cpu, psutil.virtual_memory().percent
+        except Exception:
+            return 0.0, 0.0
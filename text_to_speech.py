@@ -1,10 +1,114 @@
-from TTS.api import TTS
+import hashlib
+import json
 import os
+import re
 import threading
+import numpy as np
+from speech_cache import SpeechCache
+from audio_output import write_wav_atomic
+from tts_inference import configure_threads, apply_inference_profile, inference_tag, TTS_INFERENCE_PROFILE
 
 # Global TTS instance for better performance
 _tts_instance = None
 _tts_lock = threading.Lock()
+_speech_cache = None
+_voice_ids = {}
+# The model runs one synthesis at a time; background work (phrase pre-synthesis)
+# only takes it when no foreground reply is waiting
+_synthesis_lock = threading.Lock()
+_priority = threading.Condition()
+_foreground_waiting = 0
+
+MODEL_NAME = "tts_models/multilingual/multi-dataset/your_tts"
+SPEAKER_WAV = "optimus-clear_nZx1aJFy.wav"
+SPEAKER_CACHE_DIR = os.environ.get("OPTIMUS_SPEAKER_CACHE", os.path.join(".cache", "speaker_embeddings"))
+SPEECH_CACHE_DIR = os.environ.get("OPTIMUS_SPEECH_CACHE", os.path.join(".cache", "speech"))
+SPEECH_CACHE_MEMORY_MB = int(os.environ.get("OPTIMUS_SPEECH_CACHE_MEMORY_MB", "64"))
+SPEECH_CACHE_DISK_MB = int(os.environ.get("OPTIMUS_SPEECH_CACHE_DISK_MB", "512"))
+
+
+def file_sha256(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SpeakerConditioningCache:
+    """
+    Keeps YourTTS speaker embeddings in memory and on disk, keyed by the
+    model and the reference wav's content hash, so the reference clip is
+    loaded and encoded once instead of on every synthesis call.
+    """
+
+    def __init__(self, model_name, cache_dir=SPEAKER_CACHE_DIR):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self._embeddings = {}
+        self._file_hashes = {}  # (path, mtime, size) -> content hash
+        self._lock = threading.Lock()
+
+    def _key(self, path):
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        if file_key not in self._file_hashes:
+            self._file_hashes[file_key] = file_sha256(path)
+        return hashlib.sha256(f"{self.model_name}:{self._file_hashes[file_key]}".encode()).hexdigest()
+
+    def get(self, path, compute):
+        """Return the embedding for `path`, computing it with `compute(path)` only on a cache miss"""
+        with self._lock:
+            key = self._key(path)
+            if key in self._embeddings:
+                return self._embeddings[key]
+
+            cache_path = os.path.join(self.cache_dir, f"{key}.json")
+            if os.path.exists(cache_path):
+                try:
+                    with open(cache_path, "r") as f:
+                        self._embeddings[key] = json.load(f)
+                    return self._embeddings[key]
+                except Exception as e:
+                    print(f"⚠️ Ignoring unreadable speaker cache {cache_path}: {e}")
+
+            print(f"🎙️ Computing speaker embedding for {path}...")
+            embedding = compute(path)
+            self._embeddings[key] = embedding
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cache_path, "w") as f:
+                    json.dump(embedding, f)
+            except Exception as e:
+                print(f"⚠️ Could not write speaker cache: {e}")
+            return embedding
+
+
+def install_speaker_cache(tts, model_name):
+    """
+    Route the model's speaker encoder through a SpeakerConditioningCache and
+    warm it with the Optimus reference clip. Every tts_to_file(speaker_wav=...)
+    call then reuses the stored embedding.
+    """
+    speaker_manager = getattr(tts.synthesizer.tts_model, "speaker_manager", None)
+    if speaker_manager is None:
+        return None
+
+    cache = SpeakerConditioningCache(model_name)
+    compute_embedding = speaker_manager.compute_embedding_from_clip
+
+    def cached_compute_embedding(wav_file):
+        if isinstance(wav_file, list) and len(wav_file) == 1:
+            wav_file = wav_file[0]
+        if isinstance(wav_file, str) and os.path.exists(wav_file):
+            return cache.get(wav_file, compute_embedding)
+        return compute_embedding(wav_file)
+
+    speaker_manager.compute_embedding_from_clip = cached_compute_embedding
+    if os.path.exists(SPEAKER_WAV):
+        cache.get(SPEAKER_WAV, compute_embedding)
+    return cache
 
 def get_tts_instance():
     """Get or create TTS instance with thread safety"""
@@ -13,23 +117,134 @@ def get_tts_instance():
         with _tts_lock:
             if _tts_instance is None:
                 print("🤖 Initializing TTS model...")
-                model_name = "tts_models/multilingual/multi-dataset/your_tts"
-                _tts_instance = TTS(model_name=model_name, progress_bar=False, gpu=False)
-                print("✅ TTS model loaded successfully")
+                # Imported here: TTS pulls in torch, which the main process
+                # does not need when synthesis runs in the worker
+                from TTS.api import TTS
+                # Thread pools have to be sized before torch does any work
+                threads, interop = configure_threads()
+                tts = TTS(model_name=MODEL_NAME, progress_bar=False, gpu=False)
+                # Compute the Optimus speaker conditioning once, at load time
+                install_speaker_cache(tts, MODEL_NAME)
+                apply_inference_profile(tts)
+                _tts_instance = tts
+                print(f"✅ TTS model loaded successfully ({TTS_INFERENCE_PROFILE}, "
+                      f"{threads} threads, {interop} inter-op)")
     return _tts_instance
 
+def get_speech_cache():
+    """Get the shared synthesized-speech cache"""
+    global _speech_cache
+    if _speech_cache is None:
+        with _tts_lock:
+            if _speech_cache is None:
+                _speech_cache = SpeechCache(
+                    SPEECH_CACHE_DIR,
+                    memory_limit=SPEECH_CACHE_MEMORY_MB * 1024 * 1024,
+                    disk_limit=SPEECH_CACHE_DISK_MB * 1024 * 1024
+                )
+    return _speech_cache
+
+def voice_id(speaker_wav):
+    """Content hash identifying a reference voice, memoized per file version"""
+    stat = os.stat(speaker_wav)
+    key = (os.path.abspath(speaker_wav), stat.st_mtime, stat.st_size)
+    if key not in _voice_ids:
+        _voice_ids[key] = file_sha256(speaker_wav)
+    return _voice_ids[key]
+
+def model_version():
+    """Identifies the synthesis model so cached speech is dropped when it changes"""
+    import TTS
+    return f"{MODEL_NAME}@{getattr(TTS, '__version__', 'unknown')}{inference_tag()}"
+
+def to_pcm16(wav):
+    """Peak-normalize model output to 16-bit PCM, the same way tts_to_file saves it"""
+    wav = np.asarray(wav, dtype=np.float32)
+    peak = max(0.01, float(np.max(np.abs(wav)))) if wav.size else 1.0
+    return (wav * (32767 / peak)).astype(np.int16)
+
+def write_wav(file_path, samples, sample_rate):
+    """Write 16-bit mono PCM samples to a WAV file, atomically - players never see a partial file"""
+    return write_wav_atomic(file_path, samples, sample_rate)
+
+def split_sentences(text, max_chars=200, min_chars=20):
+    """
+    Split a reply into sentence-sized chunks for pipelined synthesis.
+    Overlong sentences are broken at clause punctuation; fragments shorter
+    than `min_chars` are merged into their neighbour, since YourTTS
+    handles very short inputs poorly.
+    """
+    chunks = []
+    for sentence in re.split(r"(?<=[.!?;])\s+", text.strip()):
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(mark, 0, max_chars) for mark in (", ", ": ", " - "))
+            if cut <= 0:
+                cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                break
+            chunks.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            chunks.append(sentence)
+
+    merged = []
+    for chunk in chunks:
+        if merged and (len(merged[-1]) < min_chars or len(chunk) < min_chars):
+            merged[-1] = f"{merged[-1]} {chunk}"
+        else:
+            merged.append(chunk)
+    return merged
+
+def speech_cache_key(text, speaker_wav=SPEAKER_WAV, language="en"):
+    """Speech cache key for a reply"""
+    return SpeechCache.make_key(text, voice_id(speaker_wav), language, model_version())
+
+def _run_model(text, speaker_wav, language, background):
+    """Run the model with foreground replies taking priority over background work"""
+    global _foreground_waiting
+    with _priority:
+        if background:
+            _priority.wait_for(lambda: _foreground_waiting == 0)
+        else:
+            _foreground_waiting += 1
+    try:
+        with _synthesis_lock:
+            tts = get_tts_instance()
+            wav = tts.tts(text=text, speaker_wav=speaker_wav, language=language)
+            return to_pcm16(wav), tts.synthesizer.output_sample_rate
+    finally:
+        if not background:
+            with _priority:
+                _foreground_waiting -= 1
+                _priority.notify_all()
+
+def synthesize(text, speaker_wav=SPEAKER_WAV, language="en", background=False):
+    """
+    Synthesize `text` in the given voice and return (samples, sample_rate)
+    as 16-bit PCM. Repeated sentences are served from the speech cache.
+    Background requests yield the model to any foreground reply.
+    """
+    cache = get_speech_cache()
+    key = speech_cache_key(text, speaker_wav, language)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    samples, sample_rate = _run_model(text, speaker_wav, language, background)
+    cache.put(key, samples, sample_rate)
+    return samples, sample_rate
+
+def synthesize_to_file(text, file_path, speaker_wav=SPEAKER_WAV, language="en"):
+    """Synthesize `text` (through the speech cache) and save it as a WAV file"""
+    samples, sample_rate = synthesize(text, speaker_wav, language)
+    write_wav(file_path, samples, sample_rate)
+    return True
+
 def generate_optimus_voice_yourtts(text, speaker_wav_path, output_path):
     """Generate speech using shared TTS instance"""
     try:
         print("🗣️ Generating speech...")
-        tts = get_tts_instance()  # Use shared TTS instance
-        
-        tts.tts_to_file(
-            text=text,
-            speaker_wav=speaker_wav_path,
-            language="en",
-            file_path=output_path
-        )
+        synthesize_to_file(text, output_path, speaker_wav_path)  # Shared TTS instance behind the speech cache
         
         print(f"✅ YourTTS success! Output: {output_path}")
         return True
@@ -41,16 +256,9 @@ def generate_optimus_voice_yourtts(text, speaker_wav_path, output_path):
 def generate_speech_clean(text, output_path, speaker_wav):
     """Clean TTS generation function - same as original text_to_speech.py"""
     try:
-        tts = get_tts_instance()
-        
         # Use original text directly - no preprocessing overhead
-        # This is exactly the same as the working text_to_speech.py
-        tts.tts_to_file(
-            text=text,
-            speaker_wav=speaker_wav,
-            language="en",
-            file_path=output_path
-        )
+        # Repeated sentences come straight from the speech cache
+        synthesize_to_file(text, output_path, speaker_wav)
         
         return True
         
@@ -60,7 +268,7 @@ def generate_speech_clean(text, output_path, speaker_wav):
 
 def main():
     text = "I didn't understand the command sir. Please try again."
-    speaker_wav = "optimus-clear_nZx1aJFy.wav"
+    speaker_wav = SPEAKER_WAV
     output_file = "optimus_prime_voice.wav"
     
     # Check if audio file exists
@@ -1,66 +1,77 @@
 """
 Text-to-speech module for the Optimus Prime Voice Assistant
 """
-import time
 import os
-from text_to_speech import get_tts_instance, generate_speech_clean
+import threading
+from text_to_speech import generate_speech_clean, SPEAKER_WAV
+from tts_worker import PRIORITY_CONTENT
+from speech_scheduler import SpeechScheduler
+from phrase_splicer import split_template
 
 
 class TTSHandler:
     def __init__(self, audio_handler):
         self.audio_handler = audio_handler
+        # Every spoken reply goes through the scheduler
+        self.scheduler = SpeechScheduler(audio_handler)
+        # Set on barge-in: stops the current playback and drops pending speech
+        # until the next command is processed
+        self.cancel_event = threading.Event()
 
-    def speak_text_clean(self, text, electron_controller=None):
+    def cancel(self):
+        """Stop the current playback and skip any speech queued behind it"""
+        self.cancel_event.set()
+        self.scheduler.cancel_all()
+
+    def reset_cancel(self):
+        """Allow speech again once the interrupting command is being handled"""
+        self.cancel_event.clear()
+        self.scheduler.new_turn()
+
+    def speak_text_clean(self, text, electron_controller=None, priority=PRIORITY_CONTENT, speed=1.0, wait=True,
+                         volume=None):
         """
-        Direct TTS function - exactly like text_to_speech.py
-        No layers, no extra processing, direct TTS call
+        Speak a reply through the speech scheduler. Synthesized samples go
+        straight to the output sink; long replies play sentence by sentence
+        while the rest is still being synthesized.
         """
-        try:
-            # Play animation when speaking starts
-            if electron_controller:
-                electron_controller.play_animation()
-            
-            # Check if reference audio exists
-            speaker_wav = "optimus-clear_nZx1aJFy.wav"
-            output_path = "response.wav"
-            
-            if not os.path.exists(speaker_wav):
-                print(f"❌ Audio file '{speaker_wav}' not found!")
-                if electron_controller:
-                    electron_controller.pause_animation()
-                return False
-            
-            print(f"🗣️ Speaking: {text}")
-            
-            # DIRECT TTS CALL - exactly like text_to_speech.py
-            tts = get_tts_instance()
-            tts.tts_to_file(
-                text=text,
-                speaker_wav=speaker_wav,
-                language="en",
-                file_path=output_path
-            )
-            
-            # Additional wait for file to be completely written by the TTS process
-            # The TTS process may still be writing even after the function returns
-            time.sleep(0.5)  # Wait for TTS process to finish writing
-            
-            # Direct audio playback - no extra layers
-            self.audio_handler.play_audio_file(output_path, speed=1.0, quality=1)
-            
-            time.sleep(0.5)  # Brief pause to ensure audio finishes
-            # Pause animation when speaking ends
-            if electron_controller:
-                import threading
-                threading.Timer(0.2, electron_controller.pause_animation).start()
-                
+        if self.cancel_event.is_set():
+            return False
+        
+        # Check if reference audio exists
+        if not os.path.exists(SPEAKER_WAV):
+            print(f"❌ Audio file '{SPEAKER_WAV}' not found!")
+            return False
+        
+        print(f"🗣️ Speaking: {text}")
+        request = self.scheduler.say(text, priority=priority, speed=speed, volume=volume,
+                                     electron_controller=electron_controller)
+        if not wait:
             return True
-            
-        except Exception as e:
-            print(f"❌ Direct TTS failed: {e}")
-            if electron_controller:
-                electron_controller.pause_animation()
+        return request.wait()
+
+    def speak_template(self, template, slots, electron_controller=None, priority=PRIORITY_CONTENT, speed=1.0, wait=True,
+                       volume=None):
+        """
+        Speak a reply template with its slots filled in. Only the slot text
+        needs synthesis; the fixed parts come from the speech cache and the
+        pieces are spliced together.
+        """
+        if self.cancel_event.is_set():
+            return False
+        
+        if not os.path.exists(SPEAKER_WAV):
+            print(f"❌ Audio file '{SPEAKER_WAV}' not found!")
             return False
+        
+        text = template.format(**slots)
+        print(f"🗣️ Speaking: {text}")
+        request = self.scheduler.say(text, priority=priority, speed=speed, volume=volume,
+                                     electron_controller=electron_controller,
+                                     parts=split_template(template, slots))
+        if not wait:
+            return True
+        return request.wait()
 
     def generate_speech_async(self, text, output_path, speaker_wav):
         """Generate speech using the clean method from text_to_speech.py"""
@@ -83,52 +94,6 @@ class TTSHandler:
 
     def speak_text(self, text, electron_controller=None):
         """
-        Clean and fast text-to-speech like text_to_speech.py
+        Clean and fast text-to-speech - same in-memory path as speak_text_clean
         """
-        try:
-            # Play animation when speaking starts
-            if electron_controller:
-                electron_controller.play_animation()
-            
-            # Check if reference audio exists
-            speaker_wav = "optimus-clear_nZx1aJFy.wav"
-            output_path = "response.wav"
-            
-            if not os.path.exists(speaker_wav):
-                print(f"❌ Audio file '{speaker_wav}' not found!")
-                if electron_controller:
-                    electron_controller.pause_animation()
-                return False
-            
-            # Set audio playing flag to indicate TTS is happening
-            self.audio_handler.is_audio_playing.set()
-            
-            try:
-                # Generate speech directly - no thread pool overhead
-                if self.generate_speech_async(text, output_path, speaker_wav):
-                    # Additional wait for file to be completely written by the TTS process
-                    time.sleep(0.5)  # Wait for TTS process to finish writing
-                    
-                    # Play audio directly - no thread pool
-                    self.audio_handler.play_audio_file(output_path, speed=1.0, quality=1)
-                else:
-                    print("❌ Speech generation failed")
-                    return False
-                        
-            finally:
-                # Always clear the audio playing flag after playback
-                self.audio_handler.is_audio_playing.clear()
-            
-            # Pause animation when speaking ends
-            if electron_controller:
-                import threading
-                threading.Timer(0.2, electron_controller.pause_animation).start()
-                
-            return True
-            
-        except Exception as e:
-            print(f"❌ Text-to-speech failed: {e}")
-            self.audio_handler.is_audio_playing.clear()
-            if electron_controller:
-                electron_controller.pause_animation()
-            return False
\ No newline at end of file
+        return self.speak_text_clean(text, electron_controller)
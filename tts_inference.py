@@ -0,0 +1,124 @@
+"""
+TTS inference tuning module for the Optimus Prime Voice Assistant
+"""
+import os
+
+# fp32 runs the model as loaded; int8 dynamically quantizes its linear layers
+TTS_INFERENCE_PROFILE = os.environ.get("OPTIMUS_TTS_PROFILE", "fp32")
+TTS_THREADS = int(os.environ.get("OPTIMUS_TTS_THREADS", "0"))  # 0 = physical cores
+TTS_INTEROP_THREADS = int(os.environ.get("OPTIMUS_TTS_INTEROP_THREADS", "0"))  # 0 = derived
+TTS_TORCHSCRIPT = os.environ.get("OPTIMUS_TTS_TORCHSCRIPT", "0") == "1"
+INFERENCE_PROFILES = ("fp32", "int8")
+
+_threads_configured = False
+
+
+def detect_cores():
+    """Physical core count (logical count when that is unknown)"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return os.cpu_count() or 1
+
+
+def thread_settings(threads=TTS_THREADS, interop=TTS_INTEROP_THREADS):
+    """(intra-op, inter-op) thread counts for this host"""
+    threads = threads or detect_cores()
+    # Synthesis is one long op chain; a couple of inter-op threads is enough
+    interop = interop or max(1, min(2, threads // 4))
+    return threads, interop
+
+
+def configure_threads(threads=TTS_THREADS, interop=TTS_INTEROP_THREADS):
+    """
+    Set torch's thread pools. Must run before the model is loaded: torch
+    fixes its inter-op pool on first parallel work, and environment
+    variables such as OMP_NUM_THREADS are only read at import.
+    """
+    global _threads_configured
+    import torch
+    threads, interop = thread_settings(threads, interop)
+    torch.set_num_threads(threads)
+    if not _threads_configured:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError:
+            pass  # Already fixed by earlier parallel work
+        _threads_configured = True
+    return threads, interop
+
+
+def quantize_model(tts):
+    """Dynamic int8 quantization of the linear layers, in place"""
+    import torch
+    synthesizer = tts.synthesizer
+    # In place, so the float weights are not held alongside the quantized copy
+    synthesizer.tts_model = torch.quantization.quantize_dynamic(
+        synthesizer.tts_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    return tts
+
+
+class _TracedDecoder:
+    """
+    Stands in for the vocoder (waveform decoder) and traces it on its first
+    call with real inputs, so no example shapes have to be guessed.
+    The decoder is convolutional, so the trace holds for any length.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self._traced = {}
+
+    def __call__(self, x, g=None):
+        import torch
+        key = g is not None
+        traced = self._traced.get(key)
+        if traced is None:
+            try:
+                inputs = (x, g) if key else (x,)
+                traced = torch.jit.trace(self.module, inputs, check_trace=False)
+            except Exception as e:
+                print(f"⚠️ TorchScript tracing failed, using eager decoder: {e}")
+                traced = self.module
+            self._traced[key] = traced
+        return traced(x, g) if key else traced(x)
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+
+def enable_torchscript(tts):
+    """Run the YourTTS waveform decoder as a traced TorchScript module"""
+    model = tts.synthesizer.tts_model
+    decoder = getattr(model, "waveform_decoder", None)
+    if decoder is None:
+        print("⚠️ TorchScript: model has no waveform decoder, skipping")
+        return tts
+    # Plain attribute assignment would register it as a submodule
+    object.__setattr__(model, "waveform_decoder", _TracedDecoder(decoder))
+    model._modules.pop("waveform_decoder", None)
+    return tts
+
+
+def apply_inference_profile(tts, profile=TTS_INFERENCE_PROFILE, torchscript=TTS_TORCHSCRIPT):
+    """Apply an inference profile to a loaded TTS instance"""
+    if profile not in INFERENCE_PROFILES:
+        print(f"⚠️ Unknown TTS inference profile '{profile}', using fp32")
+        profile = "fp32"
+    tts.synthesizer.tts_model.eval()
+    if profile == "int8":
+        quantize_model(tts)
+    if torchscript:
+        enable_torchscript(tts)
+    return tts
+
+
+def inference_tag(profile=TTS_INFERENCE_PROFILE, torchscript=TTS_TORCHSCRIPT):
+    """Suffix for the speech cache key: profiles produce different audio"""
+    tag = "" if profile == "fp32" else f"+{profile}"
+    return tag + ("+ts" if torchscript else "")
@@ -0,0 +1,165 @@
+"""
+Tiered speech synthesis module for the Optimus Prime Voice Assistant
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import numpy as np
+
+FAST_TTS_VOICE = os.environ.get("OPTIMUS_FAST_TTS_VOICE", "")
+FAST_TTS_RATE = 22050
+# Longest wait for a short acknowledgement before the fast tier takes over
+ACK_LATENCY_BUDGET = float(os.environ.get("OPTIMUS_TTS_ACK_BUDGET", "1.0"))
+FAST_TIER_ENABLED = os.environ.get("OPTIMUS_FAST_TTS", "1") != "0"
+
+TIER_CACHE = "cache"
+TIER_MODEL = "model"
+TIER_FAST = "fast"
+
+
+class SayEngine:
+    """Lightweight fallback voice: the macOS `say` synthesizer, rendered to memory"""
+    name = "say"
+
+    def __init__(self, voice=FAST_TTS_VOICE, rate=FAST_TTS_RATE):
+        self.voice = voice
+        self.rate = rate
+
+    def available(self):
+        return shutil.which("say") is not None
+
+    def synthesize(self, text):
+        from audio_sources import load_wav
+        fd, path = tempfile.mkstemp(prefix="optimus_fast_", suffix=".wav")
+        os.close(fd)
+        try:
+            cmd = ["say", "-o", path, "--file-format=WAVE", f"--data-format=LEI16@{self.rate}"]
+            if self.voice:
+                cmd.extend(["-v", self.voice])
+            cmd.append(text)
+            subprocess.run(cmd, check=True, capture_output=True, timeout=10)
+            return np.frombuffer(load_wav(path, self.rate), dtype=np.int16), self.rate
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class LatencyEstimator:
+    """Running estimate of model synthesis time per character of text"""
+
+    def __init__(self, seconds_per_char=0.025, smoothing=0.3):
+        self.seconds_per_char = seconds_per_char
+        self.smoothing = smoothing
+
+    def update(self, text, elapsed):
+        if text:
+            observed = elapsed / len(text)
+            self.seconds_per_char += self.smoothing * (observed - self.seconds_per_char)
+
+    def estimate(self, text, cpu_percent=0.0):
+        # A busy CPU slows the model down roughly in proportion to what is left
+        slowdown = min(4.0, 100.0 / max(25.0, 100.0 - cpu_percent))
+        return len(text) * self.seconds_per_char * slowdown
+
+
+class TTSMetrics:
+    """Counts which tier served each request, and why the fast tier was used"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tiers = {}
+        self.fallback_reasons = {}
+        self.latency = {}
+
+    def record(self, tier, elapsed, reason=None):
+        with self._lock:
+            self.tiers[tier] = self.tiers.get(tier, 0) + 1
+            self.latency.setdefault(tier, []).append(elapsed)
+            if reason:
+                self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "tiers": dict(self.tiers),
+                "fallback_reasons": dict(self.fallback_reasons),
+                "mean_latency": {tier: sum(values) / len(values) for tier, values in self.latency.items()},
+            }
+
+    def report(self):
+        snapshot = self.snapshot()
+        if not snapshot["tiers"]:
+            return
+        tiers = ", ".join(f"{tier} {count} ({snapshot['mean_latency'][tier]:.2f}s avg)"
+                          for tier, count in snapshot["tiers"].items())
+        print(f"📊 TTS tiers: {tiers}")
+        if snapshot["fallback_reasons"]:
+            reasons = ", ".join(f"{reason} {count}" for reason, count in snapshot["fallback_reasons"].items())
+            print(f"📊 Fast tier fallbacks: {reasons}")
+
+
+class TieredSynthesizer:
+    """
+    Picks the cheapest acceptable way to voice a request: the speech cache,
+    then the full model, unless the system is overloaded or the model would
+    miss the request's latency budget - then the fast engine speaks it.
+    Requests without a budget always get the Optimus voice.
+    """
+
+    def __init__(self, fast_engine=None):
+        self.fast_engine = fast_engine or SayEngine()
+        self.estimator = LatencyEstimator()
+        self._fast_available = FAST_TIER_ENABLED and self.fast_engine.available()
+
+    def _fallback_reason(self, text, budget):
+        if budget is None or not self._fast_available:
+            return None
+        from system_optimizer import SystemOptimizer
+        cpu, memory = SystemOptimizer.sample_load(exclude_self=True)
+        if SystemOptimizer.is_high_load(cpu, memory):
+            return "high_load"
+        if self.estimator.estimate(text, cpu) > budget:
+            return "budget"
+        return None
+
+    def synthesize(self, text, speaker_wav, language="en", budget=None, background=False, speed=1.0, volume=None,
+                   fast=False):
+        """
+        (samples, sample_rate, tier, fallback_reason), at the requested speed
+        and volume. Variants of the Optimus voice are cached with the clip.
+        fast=True skips straight to the fast engine: the rest of a reply whose
+        first sentence it already voiced must not switch voices midway.
+        """
+        from audio_effects import apply_effects
+        from text_to_speech import get_speech_cache, speech_cache_key, synthesize
+        cache = get_speech_cache()
+        key = speech_cache_key(text, speaker_wav, language)
+        if not fast:
+            cached = cache.get_variant(key, speed, volume)
+            if cached is not None:
+                return cached[0], cached[1], TIER_CACHE, None
+
+        reason = "same_reply" if fast and self._fast_available else self._fallback_reason(text, budget)
+        if reason:
+            try:
+                samples, sample_rate = apply_effects(*self.fast_engine.synthesize(text), speed, volume)
+                print(f"⚡ Fast TTS tier ({reason}): {text[:40]}")
+                return samples, sample_rate, TIER_FAST, reason
+            except Exception as e:
+                print(f"⚠️ Fast TTS tier failed, using the model: {e}")
+
+        start = time.perf_counter()
+        samples, sample_rate = synthesize(text, speaker_wav, language, background=background)
+        self.estimator.update(text, time.perf_counter() - start)
+        variant = cache.get_variant(key, speed, volume)
+        if variant is None:
+            variant = apply_effects(samples, sample_rate, speed, volume)
+        return variant[0], variant[1], TIER_MODEL, None
+
+
+tts_metrics = TTSMetrics()
@@ -0,0 +1,346 @@
+"""
+TTS worker process module for the Optimus Prime Voice Assistant
+"""
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from tts_tiers import tts_metrics
+
+TTS_WORKER_ENABLED = os.environ.get("OPTIMUS_TTS_WORKER", "1") != "0"
+
+# Lower value = synthesized first
+PRIORITY_ERROR = 0
+PRIORITY_ACK = 1
+PRIORITY_CONTENT = 2
+PRIORITY_BACKGROUND = 3
+
+_worker = None
+_worker_lock = threading.Lock()
+_local_tts = None
+
+
+def _worker_main(requests, results):
+    """
+    Entry point of the worker process: loads YourTTS once, then serves
+    (job_id, text, speaker_wav, language, budget, speed, volume, fast) requests one at a time and
+    hands the samples back in a shared memory block.
+    """
+    try:
+        from text_to_speech import get_tts_instance, SPEAKER_WAV
+        from tts_tiers import TieredSynthesizer
+        get_tts_instance()
+        tiers = TieredSynthesizer()
+    except Exception as e:
+        results.put(("error", str(e)))
+        return
+    results.put(("ready", os.getpid()))
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        job_id, text, speaker_wav, language, budget, speed, volume, fast = request
+        try:
+            start = time.perf_counter()
+            samples, sample_rate, tier, reason = tiers.synthesize(text, speaker_wav or SPEAKER_WAV, language, budget,
+                                                                  speed=speed, volume=volume, fast=fast)
+            elapsed = time.perf_counter() - start
+            block = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+            np.ndarray(samples.shape, dtype=np.int16, buffer=block.buf)[:] = samples
+            results.put((job_id, block.name, samples.size, sample_rate, None, tier, reason, elapsed))
+            block.close()
+        except Exception as e:
+            results.put((job_id, None, 0, 0, str(e), None, None, 0.0))
+
+
+def _take_shared_samples(name, size):
+    """Copy samples out of a worker's shared memory block and free it"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray((size,), dtype=np.int16, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+class SpeechJob:
+    """One synthesis request; result() blocks until the audio is ready"""
+
+    def __init__(self, job_id, text, speaker_wav, language, priority, budget=None, speed=1.0, volume=None,
+                 fast=False):
+        self.job_id = job_id
+        self.text = text
+        self.speaker_wav = speaker_wav
+        self.language = language
+        self.priority = priority
+        # Seconds the caller can wait before a fast fallback voice is acceptable
+        self.budget = budget
+        # Applied in the worker, so the variant is cached with the clip
+        self.speed = speed
+        self.volume = volume
+        # Voice with the fast engine outright (see TieredSynthesizer.synthesize)
+        self.fast = fast
+        # Which synthesis tier served the job (see tts_tiers)
+        self.tier = None
+        self.fallback_reason = None
+        self.cancelled = threading.Event()
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def cancel(self):
+        self.cancelled.set()
+        self._done.set()
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def result(self, timeout=None):
+        """(samples, sample_rate), or None if the job was cancelled"""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Speech synthesis timed out: {self.text[:40]}")
+        if self.cancelled.is_set():
+            return None
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        return self._result
+
+
+class TTSWorker:
+    """
+    Hosts the TTS model in a separate process so inference neither blocks
+    the listen loop nor competes with audio capture for the GIL.
+    Jobs are dispatched one at a time in priority order; cancelled jobs are
+    dropped before dispatch, or their result is discarded.
+    """
+
+    def __init__(self):
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._pending = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._current = None
+        self._dispatcher = None
+        self._stopping = False
+
+    def start(self):
+        with self._condition:
+            if self._process is not None and self._process.is_alive():
+                return
+            self._stopping = False
+            self._requests = self._context.Queue()
+            self._results = self._context.Queue()
+            self._process = self._context.Process(
+                target=_worker_main, args=(self._requests, self._results),
+                name="tts-worker", daemon=True
+            )
+            self._process.start()
+            self._dispatcher = threading.Thread(target=self._dispatch, name="tts-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            for _, _, job in self._pending:
+                job.cancel()
+            self._pending.clear()
+            self._condition.notify_all()
+        if self._process is not None:
+            self._requests.put(None)
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+
+    def submit(self, text, speaker_wav=None, language="en", priority=PRIORITY_CONTENT, budget=None,
+               speed=1.0, volume=None, fast=False):
+        """Queue a synthesis job and return its SpeechJob"""
+        job = SpeechJob(next(self._counter), text, speaker_wav, language, priority, budget, speed, volume, fast)
+        with self._condition:
+            heapq.heappush(self._pending, (priority, job.job_id, job))
+            self._condition.notify_all()
+        self.start()
+        return job
+
+    def _next_job(self):
+        with self._condition:
+            while not self._stopping:
+                while self._pending:
+                    _, _, job = heapq.heappop(self._pending)
+                    if not job.cancelled.is_set():
+                        self._current = job
+                        return job
+                self._condition.wait()
+            return None
+
+    def _receive(self):
+        """Next message from the worker, or None if the process died"""
+        while True:
+            try:
+                return self._results.get(timeout=0.5)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    return None
+
+    def _dispatch(self):
+        message = self._receive()
+        if message is None or message[0] != "ready":
+            error = message[1] if message else "worker exited"
+            print(f"❌ TTS worker failed to start: {error}")
+            self._fail_all(f"TTS worker unavailable: {error}")
+            return
+        print(f"✅ TTS worker ready (pid {message[1]})")
+
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._requests.put((job.job_id, job.text, job.speaker_wav, job.language, job.budget,
+                                job.speed, job.volume, job.fast))
+            message = self._receive()
+            with self._condition:
+                self._current = None
+            if message is None:
+                job._finish(error="TTS worker exited")
+                self._fail_all("TTS worker exited")
+                return
+            _, name, size, sample_rate, error, tier, reason, elapsed = message
+            if error is not None:
+                job._finish(error=error)
+                continue
+            samples = _take_shared_samples(name, size)
+            job.tier, job.fallback_reason = tier, reason
+            tts_metrics.record(tier, elapsed, reason)
+            if not job.cancelled.is_set():
+                job._finish(result=(samples, sample_rate))
+
+    def _fail_all(self, error):
+        with self._condition:
+            for _, _, job in self._pending:
+                job._finish(error=error)
+            self._pending.clear()
+            self._process = None
+
+
+def get_tts_worker():
+    """Get the shared TTS worker, starting its process on first use"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker()
+            _worker.start()
+        return _worker
+
+
+class LocalTTS:
+    """
+    In-process stand-in for TTSWorker (OPTIMUS_TTS_WORKER=0): the same
+    priority queue, served by one thread in this process. As in the worker,
+    a job that is already running finishes before a more urgent one starts.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._tiers = None
+        self._thread = threading.Thread(target=self._serve, name="tts-local", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, speaker_wav=None, language="en", priority=PRIORITY_CONTENT, budget=None,
+               speed=1.0, volume=None, fast=False):
+        """Queue a synthesis job and return its SpeechJob"""
+        job = SpeechJob(next(self._counter), text, speaker_wav, language, priority, budget, speed, volume, fast)
+        with self._condition:
+            heapq.heappush(self._pending, (priority, job.job_id, job))
+            self._condition.notify_all()
+        return job
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                while self._pending:
+                    _, _, job = heapq.heappop(self._pending)
+                    if not job.cancelled.is_set():
+                        return job
+                self._condition.wait()
+
+    def _serve(self):
+        while True:
+            self._synthesize(self._next_job())
+
+    def _synthesize(self, job):
+        try:
+            from text_to_speech import SPEAKER_WAV
+            from tts_tiers import TieredSynthesizer
+            if self._tiers is None:
+                self._tiers = TieredSynthesizer()
+            start = time.perf_counter()
+            samples, sample_rate, job.tier, job.fallback_reason = self._tiers.synthesize(
+                job.text, job.speaker_wav or SPEAKER_WAV, job.language, job.budget,
+                background=job.priority >= PRIORITY_BACKGROUND, speed=job.speed, volume=job.volume,
+                fast=job.fast
+            )
+            tts_metrics.record(job.tier, time.perf_counter() - start, job.fallback_reason)
+            job._finish(result=(samples, sample_rate))
+        except Exception as e:
+            job._finish(error=str(e))
+
+
+def get_local_tts():
+    """Get the shared in-process synthesis queue"""
+    global _local_tts
+    with _worker_lock:
+        if _local_tts is None:
+            _local_tts = LocalTTS()
+        return _local_tts
+
+
+def submit_speech(text, speaker_wav=None, language="en", priority=PRIORITY_CONTENT, budget=None,
+                  speed=1.0, volume=None, fast=False):
+    """
+    Queue synthesis of `text` without waiting; returns a SpeechJob.
+    With a `budget` (seconds), a short reply may be voiced by the fast tier
+    when the model would be too slow or the system is overloaded; fast=True
+    uses the fast tier outright.
+    `speed` (time-stretch, pitch kept) and `volume` are applied to the result.
+    """
+    if TTS_WORKER_ENABLED:
+        return get_tts_worker().submit(text, speaker_wav, language, priority, budget, speed, volume, fast)
+    return get_local_tts().submit(text, speaker_wav, language, priority, budget, speed, volume, fast)
+
+
+def request_speech(text, speaker_wav=None, language="en", priority=PRIORITY_CONTENT, budget=None,
+                   speed=1.0, volume=None, fast=False):
+    """
+    Synthesize `text` and return (samples, sample_rate), or None if the job
+    was cancelled. Runs in the worker process unless OPTIMUS_TTS_WORKER=0.
+    """
+    return submit_speech(text, speaker_wav, language, priority, budget, speed, volume, fast).result()
+
+
+def preload_tts():
+    """Start loading the TTS model without waiting for it"""
+    if TTS_WORKER_ENABLED:
+        get_tts_worker()
+    else:
+        from text_to_speech import get_tts_instance
+        get_tts_instance()
+
+
+def shutdown_tts_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
@@ -0,0 +1,87 @@
+"""
+Voice activity detection module for the Optimus Prime Voice Assistant
+"""
+import numpy as np
+from audio_preprocessing import frame_rms
+
+# Endpointer states returned by VoiceActivityDetector.process
+VAD_WAITING = "waiting"      # No speech yet, still inside the listen window
+VAD_SPEAKING = "speaking"    # Utterance in progress
+VAD_ENDED = "ended"          # Trailing silence reached, utterance is complete
+VAD_TIMEOUT = "timeout"      # Listen window elapsed without any speech
+
+
+def chunk_rms(data):
+    """Root-mean-square energy of a chunk of 16-bit PCM audio"""
+    samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+class VoiceActivityDetector:
+    """
+    Streaming energy-based endpointer.
+    Feed it audio chunks one at a time; it reports when speech starts and
+    closes the utterance as soon as the trailing silence window is reached.
+    With a NoiseFloorTracker the speech threshold follows the room noise
+    instead of the fixed energy_threshold.
+    """
+
+    def __init__(self, rate, chunk, energy_threshold=2500, speech_start=0.2,
+                 trailing_silence=0.8, max_wait=10.0, max_utterance=10.0, noise_floor=None):
+        self.chunk_duration = chunk / float(rate)
+        self.energy_threshold = energy_threshold
+        self.noise_floor = noise_floor
+        self.speech_start = speech_start          # Seconds of voiced audio before an utterance opens
+        self.trailing_silence = trailing_silence  # Seconds of silence that close an utterance
+        self.max_wait = max_wait                  # Seconds to wait for speech before giving up
+        self.max_utterance = max_utterance        # Hard cap on a single utterance
+        self.reset()
+
+    def reset(self):
+        """Reset the endpointer for a new listen window"""
+        self.state = VAD_WAITING
+        self._waited = 0.0
+        self._voiced_run = 0.0
+        self._silence_run = 0.0
+        self._speech_time = 0.0
+
+    def start_window_chunks(self):
+        """Number of chunks that make up the speech-start window"""
+        return max(1, int(round(self.speech_start / self.chunk_duration)))
+
+    def is_speech(self, data):
+        """Check whether a single chunk is above the speech energy threshold"""
+        if self.noise_floor is None:
+            return chunk_rms(data) >= self.energy_threshold
+        levels = frame_rms(np.frombuffer(data, dtype=np.int16).astype(np.float32))
+        voiced = self.noise_floor.is_speech(float(np.sqrt(np.mean(levels * levels))))
+        self.noise_floor.update(levels)
+        return voiced
+
+    def process(self, data):
+        """
+        Feed one chunk of audio and return the endpointer state after it
+        """
+        if self.state in (VAD_ENDED, VAD_TIMEOUT):
+            return self.state
+
+        voiced = self.is_speech(data)
+
+        if self.state == VAD_WAITING:
+            self._waited += self.chunk_duration
+            self._voiced_run = self._voiced_run + self.chunk_duration if voiced else 0.0
+            if self._voiced_run >= self.speech_start:
+                self.state = VAD_SPEAKING
+                self._speech_time = self._voiced_run
+            elif self._waited >= self.max_wait:
+                self.state = VAD_TIMEOUT
+            return self.state
+
+        # Utterance in progress - look for the trailing silence
+        self._speech_time += self.chunk_duration
+        self._silence_run = 0.0 if voiced else self._silence_run + self.chunk_duration
+        if self._silence_run >= self.trailing_silence or self._speech_time >= self.max_utterance:
+            self.state = VAD_ENDED
+        return self.state
@@ -0,0 +1,52 @@
+"""
+Wake word detection module for the Optimus Prime Voice Assistant
+"""
+import json
+from voice_activity import chunk_rms
+
+
+class WakeWordDetector:
+    """
+    Lightweight keyword spotter for the wake word.
+    Uses a Vosk recognizer restricted to a two-entry grammar (the keyword and
+    an unknown-word filler), which is far cheaper than open-vocabulary
+    recognition. Quiet chunks never reach the recognizer at all.
+    """
+
+    def __init__(self, model, rate, keyword="optimus", energy_threshold=800, hangover=0.5, chunk=1024):
+        self.model = model
+        self.rate = rate
+        self.keyword = keyword.lower()
+        self.energy_threshold = energy_threshold  # Chunks quieter than this are skipped
+        self.hangover_chunks = max(1, int(rate / chunk * hangover))
+        self._recognizer = None
+        self._quiet_chunks = 0
+        self.reset()
+
+    def reset(self):
+        """Start spotting from a clean recognizer state"""
+        from vosk import KaldiRecognizer
+        self._recognizer = KaldiRecognizer(self.model, self.rate, json.dumps([self.keyword, "[unk]"]))
+        self._quiet_chunks = self.hangover_chunks
+
+    def process(self, data):
+        """
+        Feed one chunk of 16-bit PCM audio; returns True when the wake word was heard
+        """
+        if chunk_rms(data) < self.energy_threshold:
+            self._quiet_chunks += 1
+            # Keep feeding a short tail so the keyword's last syllable is decoded
+            if self._quiet_chunks > self.hangover_chunks:
+                return False
+        else:
+            self._quiet_chunks = 0
+
+        if self._recognizer.AcceptWaveform(bytes(data)):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self._recognizer.PartialResult()).get("partial", "")
+
+        if self.keyword in text.split():
+            self.reset()
+            return True
+        return False